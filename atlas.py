@@ -0,0 +1,52 @@
+"""Packs every distinct piece image into one Surface so a whole batch of pieces draws with one blits() call"""
+__version__ = '04/02/2025'
+__author__ = 'Kayla Cao'
+
+import pygame
+
+ATLAS_WIDTH = 1024  # wider images make the atlas as wide as they are
+PADDING = 1  # gap between packed images
+
+class Atlas:
+    """One Surface holding many images, and where in it each one went"""
+    def __init__(self, images):
+        """initialization: shelf-pack the images, tallest first"""
+        unique = list({id(image): image for image in images}.values())
+        unique.sort(key=lambda image: (-image.get_height(), -image.get_width()))
+
+        width = max([ATLAS_WIDTH] + [image.get_width() for image in unique])
+        positions = []
+        x = y = shelf_height = 0
+        for image in unique:
+            w, h = image.get_size()
+            if x + w > width:
+                # start a new shelf under the last one
+                x = 0
+                y += shelf_height + PADDING
+                shelf_height = 0
+            positions.append((x, y))
+            x += w + PADDING
+            shelf_height = max(shelf_height, h)
+
+        self.surface = pygame.Surface((width, max(1, y + shelf_height)), pygame.SRCALPHA)
+        if pygame.display.get_surface() is not None:
+            self.surface = self.surface.convert_alpha()
+        self.surface.fill((0, 0, 0, 0))
+
+        self.regions = {}  # id(image) -> area of the atlas it was copied to
+        self.images = unique  # keeps the ids above from being reused
+        for image, position in zip(unique, positions):
+            self.surface.blit(image, position)
+            self.regions[id(image)] = pygame.Rect(position, image.get_size())
+
+    def blit_list(self, sprites, rects):
+        """(source, dest, area) for each sprite, ready for Surface.blits. Images that aren't in the
+        atlas (like the player's) are blitted from their own Surface"""
+        sequence = []
+        for sprite, rect in zip(sprites, rects):
+            area = self.regions.get(id(sprite.image))
+            if area is None:
+                sequence.append((sprite.image, rect))
+            else:
+                sequence.append((self.surface, rect, area))
+        return sequence
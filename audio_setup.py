@@ -0,0 +1,108 @@
+"""Sets the mixer up before pygame.init with the smallest buffer this machine can keep fed"""
+__version__ = '04/02/2025'
+__author__ = 'Kayla Cao'
+
+import json
+import time
+import pygame
+
+AUDIO_FREQUENCY = 44100
+AUDIO_SIZE = -16  # signed 16 bit samples
+AUDIO_CHANNELS = 2
+BUFFER_CANDIDATES = (256, 512, 1024, 2048, 4096)  # sample frames, smallest (lowest latency) first
+AUDIO_SETTINGS_PATH = 'audio_settings.json'  # the calibrated buffer is remembered here
+
+LATENCY_SAMPLES = 8  # measurements per buffer size
+LATENCY_TIMEOUT = 0.5  # seconds to wait for a single measurement
+JITTER_SLACK_MS = 5  # allowance on top of the expected worst case before a buffer counts as unstable
+
+def buffer_ms(buffer, frequency=AUDIO_FREQUENCY):
+    """How long one mixer buffer lasts"""
+    return buffer * 1000 / frequency
+
+def measure_latency(samples=LATENCY_SAMPLES):
+    """Times how long the mixer takes to pick up a triggered sound, in ms (one entry per try).
+
+    A tiny silent sound is played and we wait for its channel to go idle, which happens
+    once the mixer has actually mixed it. Returns None for tries that never finished."""
+    frequency, size, channels = pygame.mixer.get_init()
+    blip_frames = 16
+    blip = pygame.mixer.Sound(buffer=bytes(blip_frames * channels * abs(size) // 8))
+    blip_ms = buffer_ms(blip_frames, frequency)
+    channel = pygame.mixer.Channel(0)
+
+    results = []
+    for _ in range(samples):
+        channel.stop()
+        start = time.perf_counter()
+        channel.play(blip)
+        while channel.get_busy():
+            if time.perf_counter() - start > LATENCY_TIMEOUT:
+                break
+            time.sleep(0.0005)
+        else:
+            results.append(max(0.0, (time.perf_counter() - start) * 1000 - blip_ms))
+            continue
+        results.append(None)
+    channel.stop()
+    return results
+
+def is_stable(latencies, buffer):
+    """A buffer is kept fed if every trigger got mixed within about two buffer periods"""
+    if not latencies or None in latencies:
+        return False
+    return max(latencies) <= 2 * buffer_ms(buffer) + JITTER_SLACK_MS
+
+def calibrate(candidates=BUFFER_CANDIDATES):
+    """Tries buffer sizes from smallest up and keeps the first one that runs without falling behind.
+    Leaves the mixer running with that buffer. Returns (buffer, latencies)"""
+    latencies = []
+    for buffer in candidates:
+        pygame.mixer.quit()
+        pygame.mixer.init(AUDIO_FREQUENCY, AUDIO_SIZE, AUDIO_CHANNELS, buffer)
+        latencies = measure_latency()
+        if is_stable(latencies, buffer):
+            return buffer, latencies
+    return candidates[-1], latencies
+
+def load_settings():
+    """The buffer size picked last time, or None"""
+    try:
+        with open(AUDIO_SETTINGS_PATH) as f:
+            return json.load(f).get('buffer')
+    except (OSError, ValueError):
+        return None
+
+def save_settings(buffer):
+    """Remember the calibrated buffer so later launches skip calibration"""
+    try:
+        with open(AUDIO_SETTINGS_PATH, 'w') as f:
+            json.dump({'buffer': buffer, 'frequency': AUDIO_FREQUENCY}, f)
+    except OSError as e:
+        print(f"Error saving audio settings: {e}")
+
+def report(buffer, latencies):
+    """Print what the mixer is running with"""
+    measured = sorted(latency for latency in latencies if latency is not None)
+    if measured:
+        median = measured[len(measured) // 2]
+        print(f"Audio: {AUDIO_FREQUENCY} Hz, buffer {buffer} ({buffer_ms(buffer):.1f} ms), "
+              f"trigger-to-mixer latency {median:.1f} ms median, {measured[-1]:.1f} ms worst")
+    else:
+        print(f"Audio: {AUDIO_FREQUENCY} Hz, buffer {buffer} ({buffer_ms(buffer):.1f} ms), latency not measured")
+
+def setup_audio(recalibrate=False):
+    """Call before pygame.init(). Starts the mixer with the calibrated (or remembered) buffer"""
+    buffer = None if recalibrate else load_settings()
+    try:
+        if buffer is None:
+            buffer, latencies = calibrate()
+            save_settings(buffer)
+        else:
+            pygame.mixer.init(AUDIO_FREQUENCY, AUDIO_SIZE, AUDIO_CHANNELS, buffer)
+            latencies = measure_latency()
+    except pygame.error as e:
+        print(f"Error starting audio: {e}")
+        return None
+    report(buffer, latencies)
+    return buffer
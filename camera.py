@@ -0,0 +1,39 @@
+"""Camera that scrolls the view instead of moving every piece in the level"""
+__version__ = '04/02/2025'
+__author__ = 'Kayla Cao'
+
+from config import *
+
+class Camera:
+    """Holds a single x offset; everything in the level stays in world coordinates"""
+    def __init__(self):
+        """initialization"""
+        self.x = 0  # world x of the left edge of the screen
+        self.prev_x = 0  # where it was before the last simulation step
+
+    def apply(self, rect):
+        """Returns where a world rect shows up on the screen"""
+        return rect.move(-self.x, 0)
+
+    def save(self):
+        """Remember the current offset before the next simulation step"""
+        self.prev_x = self.x
+
+    def view_x(self, alpha):
+        """Offset blended between the last two simulation steps"""
+        if abs(self.x - self.prev_x) > INTERPOLATION_MAX_JUMP:
+            return self.x
+        return round(self.prev_x + (self.x - self.prev_x) * alpha)
+
+    def follow(self, rect):
+        """Scroll so the rect stays between the world shift boundaries"""
+        if rect.right - self.x >= WORLD_SHIFT_RIGHT_BOUNDARY:
+            self.x = rect.right - WORLD_SHIFT_RIGHT_BOUNDARY
+
+        if rect.left - self.x <= WORLD_SHIFT_LEFT_BOUNDARY:
+            self.x = rect.left - WORLD_SHIFT_LEFT_BOUNDARY
+
+    def reset(self):
+        """Snap back to the start of the level"""
+        self.x = 0
+        self.prev_x = 0
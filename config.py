@@ -6,4 +6,31 @@ SCREEN_WIDTH = 800
 SCREEN_HEIGHT = 600
 
 WORLD_SHIFT_LEFT_BOUNDARY = 150
-WORLD_SHIFT_RIGHT_BOUNDARY = 650
\ No newline at end of file
+WORLD_SHIFT_RIGHT_BOUNDARY = 650
+
+# Simulation runs at a fixed rate; rendering keeps pace with the display and blends between steps
+SIMULATION_HZ = 60
+STEP_MS = 1000 / SIMULATION_HZ
+MAX_FRAME_MS = 250  # a slow frame never asks for more than this much catch-up
+RENDER_FPS = 60  # render cap when the display's refresh rate can't be found out
+INTERPOLATION_MAX_JUMP = 100  # moves bigger than this in one step are teleports, not motion
+
+# Every run's inputs are saved here so it can be replayed exactly
+REPLAY_DIR = 'replays'
+
+# F3 shows per-phase frame timings, F4 saves them as a Chrome trace here
+PROFILE_TRACE_PATH = 'frame_trace.json'
+
+# Where high scores are kept: 'binary' (scores.dat + scores.idx) or 'sqlite' (scores.db, shareable)
+SCORE_BACKEND = 'binary'
+
+# Online leaderboard (run one with: python leaderboard.py serve). None keeps scores local only
+LEADERBOARD_HOST = None
+LEADERBOARD_PORT = 8765
+
+# Hold R to rewind up to this many seconds; a full snapshot is kept every REWIND_KEYFRAME_INTERVAL steps
+REWIND_SECONDS = 30
+REWIND_KEYFRAME_INTERVAL = 60
+
+# Levels with at least this many moving pieces and lasers step them all at once with NumPy (if it's installed)
+BATCH_MOVERS_MIN = 256
@@ -6,78 +6,70 @@ import pygame
 from HighScore import HighScore
 from config import *
 from sounds import *
-
-
-def draw_text(screen, text, font, color, center_pos):
-    """Helper function to draw text with proper rendering"""
-    text_surf = font.render(text, True, color)
-    text_rect = text_surf.get_rect(center=center_pos)
-    screen.blit(text_surf, text_rect)
-    return text_rect
-
-def game_over_screen(screen, font, score, level_completed, high_score):
-    """Displays game over screen with statistics."""
-
-    # Create a surface to draw on
-    screen_surface = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
-    screen_surface.fill((0, 0, 0))  # Black background
+from score_db import level_name
+from menu_ui import *
+
+
+def percentile_lines(ranks):
+    """'Score beats 62% of runs' and the per-level time equivalents, from RunPercentiles.record"""
+    if ranks is None:
+        return []
+    score_rank, time_ranks = ranks
+    lines = []
+    if score_rank is not None:
+        lines.append(f'Score beats {score_rank:.0%} of runs')
+    level_parts = [f'{level_name(level)} {rank:.0%}'
+                   for level, rank in enumerate(time_ranks, start=1) if rank is not None]
+    if level_parts:
+        lines.append('Times beat: ' + ', '.join(level_parts))
+    return lines
+
+def game_over_menu(score, level_completed, high_score, ranks=None):
+    """The game over screen with statistics, as a menu that name entry can add to"""
+    menu = Menu()
+    center_x = SCREEN_WIDTH // 2
+    center_y = SCREEN_HEIGHT // 2
 
     # Game Over text
-    game_over_font = pygame.font.Font(None, 100)
-    if level_completed >= 3:
-        game_over_text = game_over_font.render('YOU FINISHED', True, (255, 0, 0))
-    else:
-        game_over_text = game_over_font.render('GAME OVER', True, (255, 0, 0))
-    game_over_rect = game_over_text.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 - 200))
-    screen_surface.blit(game_over_text, game_over_rect)
-
-    # Detailed stats font
-    stats_font = pygame.font.Font(None, 50)
+    title = 'YOU FINISHED' if level_completed >= 3 else 'GAME OVER'
+    menu.add(Label(title, get_font(100), (255, 0, 0), (center_x, center_y - 200)))
 
-    # Score text
-    score_text = stats_font.render(f'Final Score: {score}', True, (255, 255, 255))
-    score_rect = score_text.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 - 100))
-    screen_surface.blit(score_text, score_rect)
-
-    # Level completed text
-    level_text = stats_font.render(f'Levels Completed: {level_completed}', True, (255, 255, 255))
-    level_rect = level_text.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 - 50))
-    screen_surface.blit(level_text, level_rect)
+    # Detailed stats
+    stats_font = get_font(50)
+    menu.add(Label(f'Final Score: {score}', stats_font, (255, 255, 255), (center_x, center_y - 100)))
+    menu.add(Label(f'Levels Completed: {level_completed}', stats_font, (255, 255, 255), (center_x, center_y - 50)))
 
     # High score comparison
     if score > high_score:
-        high_score_text = stats_font.render(f'NEW HIGH SCORE! Previous: {high_score}', True, (0, 255, 0))
+        menu.add(Label(f'NEW HIGH SCORE! Previous: {high_score}', stats_font, (0, 255, 0), (center_x, center_y)))
     else:
-        high_score_text = stats_font.render(f'High Score: {high_score}', True, (255, 255, 255))
+        menu.add(Label(f'High Score: {high_score}', stats_font, (255, 255, 255), (center_x, center_y)))
 
-    high_score_rect = high_score_text.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2))
-    screen_surface.blit(high_score_text, high_score_rect)
+    # Percentile ranks against every earlier run
+    for i, line in enumerate(percentile_lines(ranks)):
+        menu.add(Label(line, get_font(30), (255, 255, 0), (center_x, center_y + 35 + i * 25)))
 
     # Instructions
-    instruction_font = pygame.font.Font(None, 40)
-    enter_text = instruction_font.render('Press ENTER to save score', True, (0, 255, 0))
-    esc_text = instruction_font.render('Press ESC to skip', True, (255, 0, 0))
-
-    enter_rect = enter_text.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 + 100))
-    esc_rect = esc_text.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 + 150))
-
-    screen_surface.blit(enter_text, enter_rect)
-    screen_surface.blit(esc_text, esc_rect)
-
-    screen.blit(screen_surface, (0, 0))
-    pygame.display.flip()
-
-def user_input(screen, font, score, scores, level_completed, high_score):
-    """Handle user input for name entry"""
+    instruction_font = get_font(40)
+    menu.add(Label('Press ENTER to save score', instruction_font, (0, 255, 0), (center_x, center_y + 100)))
+    menu.add(Label('Press ESC to skip', instruction_font, (255, 0, 0), (center_x, center_y + 150)))
+    return menu
+
+def game_over_screen(screen, font, score, level_completed, high_score, ranks=None):
+    """Displays game over screen with statistics. ranks compares the run with earlier ones"""
+    game_over_menu(score, level_completed, high_score, ranks).draw(screen)
+
+def user_input(screen, font, score, scores, level_completed, high_score, score_store, level_times=None,
+               leaderboard=None, ranks=None):
+    """Handle user input for name entry. The score (and level times) go into score_store,
+    and are queued for the online leaderboard if there is one"""
     user = ""
-    clock = pygame.time.Clock()
-
-    # Create a persistent surface
-    input_surface = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
-    input_surface.fill((0, 0, 0))
+    result = None
 
-    # Render static elements
-    game_over_screen(screen, font, score, level_completed, high_score)
+    menu = game_over_menu(score, level_completed, high_score, ranks)
+    name_label = menu.add(Label('Enter 3 letters: ', get_font(50), (255, 255, 255),
+                                (SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 + 200)))
+    menu.draw(screen)
 
     sound_manager = SoundManager()
     if level_completed >= 3:
@@ -85,64 +77,52 @@ def user_input(screen, font, score, scores, level_completed, high_score):
     else:
         sound_manager.play_game_lost()
 
-    while True:
-        clock.tick(10)  # Limit frame rate
-
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT or \
-                    (event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE):
-                return None
-            if event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_RETURN and user:
-                    try:
-                        scores.append(HighScore(user, score))
-                        scores.sort(reverse=True)
-                        with open('scores.txt', 'w') as f:
-                            f.write('\n'.join(str(s) for s in scores))
-                        return user
-                    except Exception as e:
-                        print(f"Error saving score: {e}")
-                        return None
-                elif event.key == pygame.K_BACKSPACE and user:
-                    user = user[:-1]
-                elif len(user) < 3 and event.unicode.isalpha():
-                    user += event.unicode.upper()
-
-        # Name entry text
-        name_font = pygame.font.Font(None, 50)
-        name_text = name_font.render(f'Enter 3 letters: {user}', True, (255, 255, 255))
-        name_rect = name_text.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 + 200))
-
-        # Recreate the surface to avoid flickering
-        screen.blit(input_surface, (0, 0))
-        game_over_screen(screen, font, score, level_completed, high_score)
-        screen.blit(name_text, name_rect)
-
-        pygame.display.flip()
+    def handle_event(event):
+        """Type initials; ENTER saves, ESC skips. Returns True when the screen is done"""
+        nonlocal user, result
+        if event.type == pygame.QUIT or \
+                (event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE):
+            return True
+        if event.type == pygame.KEYDOWN:
+            if event.key == pygame.K_RETURN and user:
+                try:
+                    score_store.add(HighScore(user, score), level_times)
+                    scores[:] = score_store.top(5)
+                    if leaderboard is not None:
+                        leaderboard.submit(HighScore(user, score), level_times)  # doesn't wait on the network
+                    result = user
+                except Exception as e:
+                    print(f"Error saving score: {e}")
+                return True
+            elif event.key == pygame.K_BACKSPACE and user:
+                user = user[:-1]
+            elif len(user) < 3 and event.unicode.isalpha():
+                user += event.unicode.upper()
+            name_label.set_text(f'Enter 3 letters: {user}')
+        return False
+
+    # Sleeps between key presses instead of redrawing every tick
+    menu.run(screen, handle_event)
+    return result
 
 def highscores_screen(screen, font, score, scores):
     """Display high scores screen"""
-    smaller_font = pygame.font.Font(None, 50)
-
-    while True:
-        screen.fill((0, 0, 0))
-        # Title
-        draw_text(screen, 'HIGH SCORES', font, (255, 255, 0),
-                  (SCREEN_WIDTH // 2, 100))
-
-        # High scores with increased spacing
-        for i, highscore in enumerate(scores[:5]):
-            color = (255, 255, 0) if highscore.score == score else (255, 255, 255)
-            draw_text(screen, f"{i + 1}. {str(highscore)}", smaller_font,
-                      color, (SCREEN_WIDTH // 2, 200 + (i * 70)))
-
-        # Exit instruction
-        draw_text(screen, 'Press ESC to exit', smaller_font, (255, 0, 0),
-                  (SCREEN_WIDTH // 2, SCREEN_HEIGHT - 50))
-
-        pygame.display.flip()
-
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT or \
-                    (event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE):
-                return True
\ No newline at end of file
+    menu = Menu()
+    smaller_font = get_font(50)
+
+    # Title
+    menu.add(Label('HIGH SCORES', font, (255, 255, 0), (SCREEN_WIDTH // 2, 100)))
+
+    # High scores with increased spacing
+    for i, highscore in enumerate(scores[:5]):
+        color = (255, 255, 0) if highscore.score == score else (255, 255, 255)
+        menu.add(Label(f"{i + 1}. {str(highscore)}", smaller_font, color, (SCREEN_WIDTH // 2, 200 + (i * 70))))
+
+    # Exit instruction
+    menu.add(Label('Press ESC to exit', smaller_font, (255, 0, 0), (SCREEN_WIDTH // 2, SCREEN_HEIGHT - 50)))
+
+    # Nothing on this screen changes, so draw it once and sleep until ESC
+    menu.draw(screen)
+    menu.run(screen, lambda event: event.type == pygame.QUIT or
+             (event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE))
+    return True
@@ -3,14 +3,16 @@ __version__ = '04/02/2025'
 __author__ = 'Kayla Cao'
 
 import pygame
+from surface_cache import get_surface
+from motion import ping_pong, duty_cycle
 
 class GamePiece(pygame.sprite.Sprite):
     """Parent class for all game pieces"""
-    def __init__(self, x, y, width, height, color):
+    def __init__(self, x, y, width, height, color, shape='rect', orientation=None):
         '''initialization'''
         pygame.sprite.Sprite.__init__(self)
-        self.image = pygame.Surface([width, height])
-        self.image.fill(color)
+        # pieces that look the same share one image
+        self.image = get_surface((width, height), color, shape, orientation)
         self.rect = self.image.get_rect()
         self.rect.x = x
         self.rect.y = y
@@ -23,17 +25,23 @@ class Laser(GamePiece):
         super().__init__(x, y, width, height, color=(255, 0, 0))
 
         # Additional laser-specific attributes
-        self.active_image = pygame.Surface([width, height])
-        self.active_image.fill((255, 0, 0))
-
-        self.inactive_image = pygame.Surface([width, height])
-        self.inactive_image.fill((25, 0, 0))
+        self.active_image = self.image
+        self.inactive_image = get_surface((width, height), (25, 0, 0))
 
         self.active_duration = active_duration
         self.inactive_duration = inactive_duration
         self.timer = 0
         self.is_active = True
 
+    def state_at(self, frame):
+        """(timer, is_active) frame steps after the laser was made, without stepping there"""
+        return duty_cycle(0, True, self.active_duration, self.inactive_duration, frame)
+
+    def seek(self, frame):
+        """Jump straight to the laser's state at a frame"""
+        self.timer, self.is_active = self.state_at(frame)
+        self.image = self.active_image if self.is_active else self.inactive_image
+
     def update(self):
         '''updates the laer'''
         self.timer += 1
@@ -48,59 +56,39 @@ class Laser(GamePiece):
             self.timer = 0
             self.image = self.active_image
 
+SPIKE_COLOR = (100, 100, 100)  # gray
+
+spike_masks = {}  # (width, height, orientation) -> Mask, shared by every spike of that shape
+
+def spike_mask(width, height, orientation):
+    """The pixels a spike actually covers, built once per shape"""
+    key = (width, height, orientation)
+    if key not in spike_masks:
+        surface = get_surface((width, height), SPIKE_COLOR, 'triangle', orientation)
+        spike_masks[key] = pygame.mask.from_surface(surface)
+    return spike_masks[key]
+
+rect_masks = {}  # (width, height) -> fully solid Mask
+
+def rect_mask(size):
+    """A solid mask the size of a rect, for testing a rect against a spike's mask"""
+    if size not in rect_masks:
+        rect_masks[size] = pygame.mask.Mask(size, fill=True)
+    return rect_masks[size]
+
 class Spike(GamePiece):
     """class for a spike"""
     def __init__(self, x, y, width, height, orientation='up'):
         """initialization"""
-        # Gray color for spikes
-        super().__init__(x, y, width, height, color=(100, 100, 100))
-
-        # Create a surface with per-pixel alpha (transparency)
-        self.image = pygame.Surface([width, height], pygame.SRCALPHA)
-
-        # Define spike points based on orientation
-        if orientation == 'up':
-            points = [
-                (0, height),  # Bottom left
-                (width // 2, 0),  # Top middle
-                (width, height)  # Bottom right
-            ]
-        elif orientation == 'down':
-            points = [
-                (0, 0),  # Top left
-                (width // 2, height),  # Bottom middle
-                (width, 0)  # Top right
-            ]
-        elif orientation == 'left':
-            points = [
-                (width, height),  # Bottom right
-                (0, height // 2),  # Middle left
-                (width, 0)  # Top right
-            ]
-        elif orientation == 'right':
-            points = [
-                (0, 0),  # Top left
-                (width, height // 2),  # Middle right
-                (0, height)  # Bottom left
-            ]
-        else:
-            # Default to up orientation
-            points = [
-                (0, height),  # Bottom left
-                (width // 2, 0),  # Top middle
-                (width, height)  # Bottom right
-            ]
-
-        # Draw the triangle on the surface
-        pygame.draw.polygon(self.image, (100, 100, 100), points)
-
-        # Set up the rectangle for collision detection
-        self.rect = self.image.get_rect()
-        self.rect.x = x
-        self.rect.y = y
+        # A gray triangle on a transparent background
+        super().__init__(x, y, width, height, SPIKE_COLOR, 'triangle', orientation)
+
+        # Exact hits are checked against the triangle, not the whole rect
+        self.mask = spike_mask(width, height, orientation)
 
 class MovingSpike(Spike):
     """class for a spike that attaches to moving platforms"""
+    moves = True  # re-bucketed in the level's spatial hash every update
     def __init__(self, platform, orientation='up', width=None, height=20):
         '''initialization'''
 
@@ -146,6 +134,7 @@ class Bouncepad(GamePiece):
 
 class Enemy(GamePiece):
     """class for an enemy that moves in a specified boundary"""
+    moves = True  # re-bucketed in the level's spatial hash every update
     def __init__(self, x, y, width, height, boundary1, boundary2, speed, move_type):
         """initialization"""
         super().__init__(x, y, width, height, color=(0, 0, 255))
@@ -160,11 +149,34 @@ class Enemy(GamePiece):
         self.player = None
         self.level = None
 
+        # Where it started, so its position at any frame can be worked out directly
+        self.start_x = x
+        self.start_y = y
+        self.start_speed = speed
+
+    def state_at(self, frame):
+        """(x, y, speed) frame steps after the enemy was made, without stepping there.
+        Enemies turn around on reaching a bound, so the open range inside it is what they move in"""
+        if self.move_type == 'horizontal':
+            x, speed = ping_pong(self.start_x, self.start_speed, self.left_boundary + 1,
+                                 self.right_boundary - 1, frame)
+            return x, self.start_y, speed
+        elif self.move_type == 'vertical':
+            y, speed = ping_pong(self.start_y, self.start_speed, self.top_boundary + 1,
+                                 self.bottom_boundary - self.rect.height - 1, frame)
+            return self.start_x, y, speed
+        return self.start_x, self.start_y, self.start_speed
+
+    def seek(self, frame):
+        """Jump straight to where the enemy is at a frame"""
+        x, y, self.speed = self.state_at(frame)
+        self.rect.topleft = (x, y)
+
     def update(self):
         """updates the enemy"""
         if self.move_type == 'horizontal':
             self.rect.x += self.speed
-            cur_pos = self.rect.x - self.level.world_shift
+            cur_pos = self.rect.x  # pieces stay in world coordinates
             if cur_pos <= self.left_boundary or cur_pos >= self.right_boundary:
                 self.speed *= -1
 
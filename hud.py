@@ -0,0 +1,55 @@
+"""The in-game heads-up display (high score, level, lives, gold, time, score)"""
+__version__ = '04/02/2025'
+__author__ = 'Kayla Cao'
+
+import pygame
+
+WHITE = (255, 255, 255)
+GOLD = (255, 215, 0)
+
+class HUD:
+    """Draws game info, only re-rendering a line when the text on it changes"""
+    def __init__(self, font=None):
+        """initialization (the font is made once for the whole session)"""
+        self.font = font or pygame.font.Font(None, 36)
+        self.labels = {}  # line name -> (text, color, rendered surface)
+        self.positions = {}  # line name -> where it goes on screen
+
+    def label(self, name, text, color=WHITE):
+        """Returns the rendered line, rendering it only if its text or color changed"""
+        cached = self.labels.get(name)
+        if cached is None or cached[0] != text or cached[1] != color:
+            cached = (text, color, self.font.render(text, True, color))
+            self.labels[name] = cached
+        return cached[2]
+
+    def update(self, player, current_level_no, high_score, score=0):
+        """Re-render any lines whose value changed. Returns the screen areas that need redrawing"""
+        # Time is shown to a tenth of a second, so it only re-renders ten times a second
+        current_time = pygame.time.get_ticks() / 1000
+
+        lines = [
+            ('high_score', f"High Score: {high_score}", WHITE),
+            ('level', f"Level: {current_level_no + 1}", WHITE),
+            ('lives', f"Lives: {player.lives}", WHITE),
+            ('gold', f"Gold: {player.gold_count}", WHITE),
+            ('gold_left', f"Gold Left: {len(player.level.gold_list)}", GOLD),
+            ('time', f"Time: {current_time:.1f}s", WHITE),
+            ('score', f"Score: {score}", GOLD),
+        ]
+
+        dirty = []
+        for row, (name, text, color) in enumerate(lines):
+            old = self.labels.get(name)
+            image = self.label(name, text, color)
+            rect = image.get_rect(topleft=(10, 10 + row * 30))
+            if old is None or old[2] is not image:
+                # cover the old text too in case the new one is shorter
+                dirty.append(rect.union(old[2].get_rect(topleft=rect.topleft)) if old else rect)
+            self.positions[name] = rect.topleft
+        return dirty
+
+    def draw(self, screen):
+        """Blit the cached lines (cheap, no text rendering happens here). Respects the screen's clip"""
+        for name, position in self.positions.items():
+            screen.blit(self.labels[name][2], position)
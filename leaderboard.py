@@ -0,0 +1,310 @@
+"""Asyncio leaderboard service: a batching game-side client and a small top-K server"""
+__version__ = '04/02/2025'
+__author__ = 'Kayla Cao'
+
+import argparse
+import asyncio
+import bisect
+import json
+import threading
+import time
+from HighScore import HighScore
+
+LEADERBOARD_PORT = 8765
+SERVER_TOP_K = 100  # scores the server keeps in memory
+BATCH_SIZE = 50  # submissions sent in one message at most
+BATCH_WINDOW = 0.05  # seconds to wait for more submissions before sending a batch
+POOL_SIZE = 2  # keep-alive connections the client keeps open
+RETRY_DELAY = 1.0  # seconds before retrying after the server can't be reached
+
+# Protocol: one JSON object per line in each direction
+#   {"op": "submit", "scores": [{"initials": "KAY", "score": 15100, "level_times": [...]}, ...]}
+#       -> {"ok": true, "accepted": 2}
+#   {"op": "top", "n": 5} -> {"ok": true, "top": [["KAY", 15100], ...]}
+
+def encode(message):
+    """One protocol line"""
+    return json.dumps(message, separators=(',', ':')).encode() + b'\n'
+
+class LeaderboardServer:
+    """Keeps a sorted top-K of every score it has been sent"""
+    def __init__(self, k=SERVER_TOP_K):
+        """initialization"""
+        self.k = k
+        self.top_entries = []  # sorted (-score, arrival number, initials), best first
+        self.received = 0
+        self.server = None
+        self.connections = {}  # writer -> task serving it, so stop() can hang up on open connections
+
+    def insert(self, initials, score):
+        """Binary search a score into the top-K"""
+        entry = (-int(score), self.received, str(initials))
+        self.received += 1
+        if len(self.top_entries) >= self.k and entry >= self.top_entries[-1]:
+            return
+        bisect.insort(self.top_entries, entry)
+        del self.top_entries[self.k:]
+
+    def handle(self, message):
+        """Answer one request"""
+        op = message.get('op')
+        if op == 'submit':
+            scores = message.get('scores', [])
+            for entry in scores:
+                self.insert(entry['initials'], entry['score'])
+            return {'ok': True, 'accepted': len(scores)}
+        if op == 'top':
+            n = int(message.get('n', 5))
+            return {'ok': True, 'top': [[initials, -neg_score] for neg_score, _, initials in self.top_entries[:n]]}
+        return {'ok': False, 'error': f"unknown op {op!r}"}
+
+    async def serve_client(self, reader, writer):
+        """One keep-alive connection: answer requests until the client hangs up"""
+        self.connections[writer] = asyncio.current_task()
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    reply = self.handle(json.loads(line))
+                except (ValueError, KeyError, TypeError) as e:
+                    reply = {'ok': False, 'error': str(e)}
+                writer.write(encode(reply))
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            self.connections.pop(writer, None)
+            writer.close()
+
+    async def start(self, host='127.0.0.1', port=LEADERBOARD_PORT):
+        """Start listening. Returns the port actually bound (pass port=0 for any free one)"""
+        self.server = await asyncio.start_server(self.serve_client, host, port)
+        return self.server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        """Stop listening and hang up on any clients still connected"""
+        self.server.close()
+        # closing the transport makes each handler's readline() see EOF, so it returns normally
+        handlers = list(self.connections.values())
+        for writer in list(self.connections):
+            writer.close()
+        await asyncio.gather(*handlers, return_exceptions=True)
+        await self.server.wait_closed()
+
+class Connection:
+    """One keep-alive connection to the server"""
+    def __init__(self, reader, writer):
+        """initialization"""
+        self.reader = reader
+        self.writer = writer
+
+    async def request(self, message):
+        """Send one request and wait for its reply"""
+        self.writer.write(encode(message))
+        await self.writer.drain()
+        line = await self.reader.readline()
+        if not line:
+            raise ConnectionError("server closed the connection")
+        return json.loads(line)
+
+    def close(self):
+        """Hang up"""
+        self.writer.close()
+
+class LeaderboardClient:
+    """Game-side client. submit() never blocks: scores are queued and sent in batches
+    from an asyncio loop on a background thread, over pooled keep-alive connections"""
+    def __init__(self, host='127.0.0.1', port=LEADERBOARD_PORT, pool_size=POOL_SIZE):
+        """initialization"""
+        self.host = host
+        self.port = port
+        self.pool_size = pool_size
+        self.sent = 0
+        self.failed_batches = 0
+
+        self.loop = asyncio.new_event_loop()
+        self.ready = threading.Event()
+        self.thread = threading.Thread(target=self.run_loop, name='leaderboard', daemon=True)
+        self.thread.start()
+        self.ready.wait()
+
+    def run_loop(self):
+        """Background thread: owns the event loop, the queue and the connections"""
+        asyncio.set_event_loop(self.loop)
+        self.queue = asyncio.Queue()
+        self.idle = asyncio.Queue()  # connections not in use
+        self.open_connections = 0
+        self.connections = set()  # every open Connection, idle or busy, so close() can hang them all up
+        self.pending = 0  # submitted but not yet accepted by the server
+        self.sending = set()  # batch tasks in flight (the loop only keeps weak references to tasks)
+        self.sender = self.loop.create_task(self.send_batches())
+        self.loop.call_soon(self.ready.set)
+        self.loop.run_forever()
+
+    def submit(self, highscore, level_times=None):
+        """Queue a score to be sent (safe to call from the game thread; returns immediately)"""
+        entry = {'initials': str(highscore.initials), 'score': int(highscore.score),
+                 'level_times': list(level_times or [])}
+        self.loop.call_soon_threadsafe(self.enqueue, entry)
+
+    def enqueue(self, entry):
+        """Runs on the client's loop: add a score to the send queue"""
+        self.pending += 1
+        self.queue.put_nowait(entry)
+
+    async def get_connection(self):
+        """Reuse an idle connection, or open one if the pool isn't full"""
+        if self.idle.empty() and self.open_connections < self.pool_size:
+            self.open_connections += 1
+            try:
+                reader, writer = await asyncio.open_connection(self.host, self.port)
+            except OSError:
+                self.open_connections -= 1
+                raise
+            connection = Connection(reader, writer)
+            self.connections.add(connection)
+            return connection
+        return await self.idle.get()
+
+    def drop(self, connection):
+        """Hang up a broken connection and free its place in the pool"""
+        connection.close()
+        self.connections.discard(connection)
+        self.open_connections -= 1
+
+    async def send_batches(self):
+        """Collect queued scores into batches and hand them to the connection pool"""
+        while True:
+            batch = [await self.queue.get()]
+            deadline = self.loop.time() + BATCH_WINDOW
+            while len(batch) < BATCH_SIZE:
+                timeout = deadline - self.loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self.queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            task = self.loop.create_task(self.send(batch))
+            self.sending.add(task)
+            task.add_done_callback(self.sending.discard)
+
+    async def send(self, batch):
+        """Send one batch, retrying until the server takes it"""
+        while True:
+            try:
+                connection = await self.get_connection()
+            except OSError:
+                self.failed_batches += 1
+                await asyncio.sleep(RETRY_DELAY)
+                continue
+            try:
+                reply = await connection.request({'op': 'submit', 'scores': batch})
+            except (OSError, ValueError):
+                # broken connection: drop it and try again on a fresh one
+                self.drop(connection)
+                self.failed_batches += 1
+                await asyncio.sleep(RETRY_DELAY)
+                continue
+            self.idle.put_nowait(connection)
+            self.pending -= len(batch)
+            if reply.get('ok'):
+                self.sent += len(batch)
+            else:
+                print(f"Leaderboard rejected scores: {reply.get('error')}")
+            return
+
+    def top(self, n=5, timeout=2.0):
+        """Ask the server for its top n (blocks up to timeout; don't call from the game loop)"""
+        async def ask():
+            connection = await self.get_connection()
+            try:
+                reply = await connection.request({'op': 'top', 'n': n})
+            except (OSError, ValueError):
+                self.drop(connection)
+                raise
+            self.idle.put_nowait(connection)
+            return [HighScore(initials, score) for initials, score in reply.get('top', [])]
+        return asyncio.run_coroutine_threadsafe(ask(), self.loop).result(timeout)
+
+    def close(self, timeout=2.0):
+        """Give queued scores up to timeout seconds to go out, then shut the thread down"""
+        async def drain():
+            end = self.loop.time() + timeout
+            while self.pending and self.loop.time() < end:
+                await asyncio.sleep(0.01)
+            # whatever is still unsent after the timeout is dropped
+            tasks = [self.sender] + list(self.sending)
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            # hang up every connection, busy or idle, and wait until each transport has really closed
+            connections = list(self.connections)
+            for connection in connections:
+                connection.close()
+            await asyncio.gather(*(connection.writer.wait_closed() for connection in connections),
+                                 return_exceptions=True)
+            self.connections.clear()
+        try:
+            asyncio.run_coroutine_threadsafe(drain(), self.loop).result(timeout + 1)
+        finally:
+            self.loop.call_soon_threadsafe(self.loop.stop)
+            self.thread.join(timeout)
+            if not self.thread.is_alive():
+                self.loop.close()
+
+async def serve(port):
+    """Run a leaderboard server until interrupted"""
+    server = LeaderboardServer()
+    port = await server.start(port=port)
+    print(f"Leaderboard listening on 127.0.0.1:{port}")
+    await asyncio.Event().wait()
+
+def load_test(clients=8, runs=20000):
+    """Start a local server, have several clients fire submissions at it, and report throughput"""
+    server = LeaderboardServer()
+    server_loop = asyncio.new_event_loop()
+    port = server_loop.run_until_complete(server.start(port=0))
+    server_thread = threading.Thread(target=server_loop.run_forever, daemon=True)
+    server_thread.start()
+
+    game_clients = [LeaderboardClient(port=port) for _ in range(clients)]
+    start = time.perf_counter()
+    submit_time = 0.0
+    for i in range(runs):
+        before = time.perf_counter()
+        game_clients[i % clients].submit(HighScore('BOT', (i * 7919) % 100000), [15000, 20000, 25000])
+        submit_time += time.perf_counter() - before
+    for client in game_clients:
+        client.close(timeout=30)
+    elapsed = time.perf_counter() - start
+
+    sent = sum(client.sent for client in game_clients)
+    print(f"{sent}/{runs} scores delivered by {clients} clients in {elapsed:.2f}s "
+          f"({sent / elapsed:.0f}/s); submit() took {submit_time / runs * 1e6:.1f} us on average")
+    print(f"server top 3: {[[initials, -neg] for neg, _, initials in server.top_entries[:3]]}")
+    asyncio.run_coroutine_threadsafe(server.stop(), server_loop).result(timeout=5)
+    server_loop.call_soon_threadsafe(server_loop.stop)
+    server_thread.join()
+    server_loop.close()
+    return sent == runs
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    commands = parser.add_subparsers(dest='command', required=True)
+    serve_parser = commands.add_parser('serve', help="run a leaderboard server on localhost")
+    serve_parser.add_argument('--port', type=int, default=LEADERBOARD_PORT)
+    test_parser = commands.add_parser('loadtest', help="load test a local server")
+    test_parser.add_argument('--clients', type=int, default=8)
+    test_parser.add_argument('--runs', type=int, default=20000)
+    args = parser.parse_args()
+
+    if args.command == 'serve':
+        try:
+            asyncio.run(serve(args.port))
+        except KeyboardInterrupt:
+            pass
+    else:
+        raise SystemExit(0 if load_test(args.clients, args.runs) else 1)
@@ -3,8 +3,13 @@ __version__ = '04/02/2025'
 __author__ = 'Kayla Cao'
 
 import pygame
+from config import *
 from platforms import *
 from gamepieces import *
+from spatial_hash import *
+from camera import Camera
+from renderer import LevelRenderer
+from mover_batch import batch_for
 
 class Level(object):
     """Parent class for all levels"""
@@ -15,26 +20,47 @@ class Level(object):
         self.level_limit = -500  # Default value, will be overridden by specific levels
 
         # How far this world has been scrolled left/right
-        self.world_shift = 0
+        self.camera = Camera()
 
         self.player = player
 
-        self.platform_list = pygame.sprite.Group()
-        self.enemy_list = pygame.sprite.Group()
-        self.laser_list = pygame.sprite.Group()
-        self.spike_list = pygame.sprite.Group()
-        self.gold_list = pygame.sprite.Group()
-        self.bouncepad_list = pygame.sprite.Group()
-
-        self.font = pygame.font.Font(None, 24)  # Default font and size
+        # Every piece goes into one spatial hash so collision checks only look nearby
+        self.grid = SpatialHash()
+        self.movers = {}  # pieces that need re-bucketing after they move
+        self.batch = None  # MoverBatch stepping the movers with NumPy, when there are enough of them
+        self.batch_checked = False
+        self.frames = 0  # updates so far; moving pieces are a function of this
+
+        self.platform_list = IndexedGroup(self)
+        self.enemy_list = IndexedGroup(self)
+        self.laser_list = IndexedGroup(self)
+        self.spike_list = IndexedGroup(self)
+        self.gold_list = IndexedGroup(self)
+        self.bouncepad_list = IndexedGroup(self)
+
+        # positions from before the last simulation step, for smooth rendering
+        self.prev_positions = {}
+
+        # Headless levels (no display) skip fonts and text entirely
+        self.headless = getattr(player, 'headless', False)
+        self.font = None if self.headless else pygame.font.Font(None, 24)  # Default font and size
         self.text_list = []
 
-
-        # Background image
-        self.background = None
+        # Static pieces get baked into background tiles the first time the level is drawn
+        self.renderer = None
 
     def update(self):
         """ Update everything in the level."""
+        self.frames += 1
+        if not self.batch_checked:
+            self.batch = batch_for(self)
+            self.batch_checked = True
+        if self.batch is not None:
+            # only pieces that crossed grid cells need re-bucketing
+            for mover in self.batch.step():
+                self.grid.move(mover)
+            return
+
         self.platform_list.update()
         self.enemy_list.update()
         for laser in self.laser_list:
@@ -43,59 +69,109 @@ class Level(object):
         self.gold_list.update()
         self.bouncepad_list.update()
 
+        # Keep the spatial hash up to date for anything that moved
+        for mover in self.movers:
+            self.grid.move(mover)
+
+    def seek(self, frame):
+        """Put every moving piece and laser where it is after frame updates, in one go.
+        (Unlike update(), moving platforms don't push the player along the way)"""
+        self.movers_changed()  # the NumPy batch holds the old state; it's rebuilt from the sprites
+        for group in (self.platform_list, self.enemy_list, self.laser_list):
+            for piece in group:
+                if hasattr(piece, 'seek'):
+                    piece.seek(frame)
+        for spike in self.spike_list:
+            if isinstance(spike, MovingSpike):
+                spike.update()  # sticks to its platform's new spot
+        for mover in self.movers:
+            self.grid.move(mover)
+        self.frames = frame
+
+    def save_positions(self):
+        """Remember where everything that moves was before the next simulation step"""
+        if self.batch is not None:
+            self.batch.sync_view()  # the player collides with whatever is near it before the batch steps
+        self.camera.save()
+        self.prev_positions = {mover: mover.rect.topleft for mover in self.movers}
+        self.prev_positions[self.player] = self.player.rect.topleft
+
+    def screen_pos(self, sprite, alpha, offset):
+        """Where to draw a sprite, blended between its last two positions"""
+        x, y = sprite.rect.topleft
+        prev = self.prev_positions.get(sprite)
+        if prev is not None and abs(x - prev[0]) + abs(y - prev[1]) <= INTERPOLATION_MAX_JUMP:
+            x = round(prev[0] + (x - prev[0]) * alpha)
+            y = round(prev[1] + (y - prev[1]) * alpha)
+        return x - offset, y
+
+    def collide(self, sprite, group):
+        """Like spritecollide, but only checks pieces near the sprite"""
+        return [piece for piece in self.grid.query(sprite.rect)
+                if piece in group and sprite.rect.colliderect(piece.rect)]
+
+    def collide_any(self, sprite, group):
+        """Like spritecollideany, but only checks pieces near the sprite"""
+        for piece in self.grid.query(sprite.rect):
+            if piece in group and sprite.rect.colliderect(piece.rect):
+                return piece
+        return None
+
+    def collide_any_exact(self, sprite, group):
+        """Like collide_any, but pieces with a mask only count if the sprite's rect touches
+        one of their solid pixels. The cheap rect test runs first"""
+        for piece in self.grid.query(sprite.rect):
+            if piece in group and sprite.rect.colliderect(piece.rect):
+                mask = getattr(piece, 'mask', None)
+                if mask is None or mask.overlap(rect_mask(sprite.rect.size),
+                                                (sprite.rect.x - piece.rect.x, sprite.rect.y - piece.rect.y)):
+                    return piece
+        return None
+
     def add_text(self, text, x, y, color=(240,240,240)):
         """Add text to be drawn in the level"""
+        if self.headless:
+            return
         text_surf = self.font.render(text, True, color)
         text_rect = text_surf.get_rect(x=x, y=y)
         self.text_list.append((text_surf, text_rect))
 
-    def draw(self, screen):
-        """Draw everything on this level. """
-        screen.fill((100, 125, 150))  # Dark bluish-gray room color
-
-        # Draw all the sprite lists
-        self.platform_list.draw(screen)
-        self.enemy_list.draw(screen)
-        self.laser_list.draw(screen)
-        self.spike_list.draw(screen)
-        self.gold_list.draw(screen)
-        self.bouncepad_list.draw(screen)
-
-        # Draw level texts
-        for text_surf, text_rect in self.text_list:
-            screen.blit(text_surf, text_rect)
-
-    def shift_world(self, shift_x):
-        """ When the user moves left/right, we need to scroll everything"""
-        # Keep track of the shift amount
-        self.world_shift += shift_x
-
-        # Go through all the sprite lists and shift
-        for platform in self.platform_list:
-            platform.rect.x += shift_x
-
-        for enemy in self.enemy_list:
-            enemy.rect.x += shift_x
-
-        # Shift obstacle groups
-        for laser in self.laser_list:
-            laser.rect.x += shift_x
-
-        for spike in self.spike_list:
-            spike.rect.x += shift_x
-
-        for gold in self.gold_list:
-            gold.rect.x += shift_x
-
-        for bouncepad in self.bouncepad_list:
-            bouncepad.rect.x += shift_x
-
-        new_text_list = []
-        for text_surf, text_rect in self.text_list:
-            text_rect.x += shift_x
-            new_text_list.append((text_surf, text_rect))
-
-        self.text_list = new_text_list
+    @property
+    def world_shift(self):
+        """How far the camera has scrolled, with the sign the old shift_world used"""
+        return -self.camera.x
+
+    def draw(self, screen, alpha=1.0, extra_sprites=(), extra_dirty=(), overlay=None):
+        """Draw everything on this level. alpha blends between the last two simulation steps.
+        Returns the screen rects that changed, or None if the whole screen was redrawn"""
+        if self.renderer is None:
+            self.renderer = LevelRenderer(self)
+        if self.batch is not None:
+            self.batch.sync_view()  # pieces the NumPy batch left stale off screen
+        return self.renderer.draw(screen, alpha, extra_sprites, extra_dirty, overlay)
+
+    def invalidate_view(self):
+        """The screen holds something else (another level was shown since this one last drew),
+        so the next draw has to repaint all of it"""
+        if self.renderer is not None:
+            self.renderer.offset = None
+
+    def movers_changed(self):
+        """A moving piece or laser came or went, so the NumPy batch has to be rebuilt"""
+        if self.batch is not None:
+            self.batch.sync()  # the sprites take over from the arrays
+        self.batch = None
+        self.batch_checked = False
+
+    def piece_added(self, piece):
+        """A piece joined the level (e.g. gold put back by a rewind), so its background tiles are stale"""
+        if self.renderer is not None:
+            self.renderer.invalidate(piece.rect)
+
+    def piece_removed(self, piece):
+        """A piece left the level (e.g. collected gold), so its background tiles are stale"""
+        if self.renderer is not None:
+            self.renderer.invalidate(piece.rect)
 
 class Level_01(Level):
     """ Level 01! The easiest level with tutorial text to help you along """
@@ -0,0 +1,88 @@
+"""A small retained-mode UI for the menu screens: widgets remember what they show, and a menu
+waits on events and only redraws the widgets that changed"""
+__version__ = '04/02/2025'
+__author__ = 'Kayla Cao'
+
+import pygame
+
+fonts = {}  # size -> Font, shared by every menu
+
+def get_font(size):
+    """The default font at a size, made once and reused"""
+    if size not in fonts:
+        fonts[size] = pygame.font.Font(None, size)
+    return fonts[size]
+
+class Label:
+    """One line of text centred on a point. The rendered text is kept until the text changes"""
+    def __init__(self, text, font, color, center):
+        """initialization"""
+        self.font = font
+        self.color = color
+        self.center = center
+        self.text = None
+        self.image = None
+        self.rect = None
+        self.old_rect = None  # where it was last drawn, if it has changed since
+        self.dirty = False
+        self.set_text(text)
+
+    def set_text(self, text):
+        """Change the text (does nothing if it's the same)"""
+        if text == self.text:
+            return
+        if not self.dirty:
+            self.old_rect = self.rect
+        self.text = text
+        self.image = self.font.render(text, True, self.color)
+        self.rect = self.image.get_rect(center=self.center)
+        self.dirty = True
+
+    def draw(self, surface):
+        """Blit the rendered text"""
+        surface.blit(self.image, self.rect)
+
+class Menu:
+    """A full-screen menu made of labels on a plain background"""
+    def __init__(self, background=(0, 0, 0)):
+        """initialization"""
+        self.background = background
+        self.widgets = []
+
+    def add(self, widget):
+        """Add a widget and return it, so it can be changed later"""
+        self.widgets.append(widget)
+        return widget
+
+    def draw(self, screen):
+        """Draw the whole menu and show it"""
+        screen.fill(self.background)
+        for widget in self.widgets:
+            widget.draw(screen)
+            widget.dirty = False
+            widget.old_rect = None
+        pygame.display.flip()
+
+    def refresh(self, screen):
+        """Redraw just the areas whose widgets changed and send only those to the display"""
+        dirty = []
+        for widget in self.widgets:
+            if widget.dirty:
+                dirty.append(widget.rect.union(widget.old_rect) if widget.old_rect else widget.rect)
+                widget.dirty = False
+                widget.old_rect = None
+        for rect in dirty:
+            screen.set_clip(rect)
+            screen.fill(self.background)
+            for widget in self.widgets:
+                if widget.rect.colliderect(rect):
+                    widget.draw(screen)
+        screen.set_clip(None)
+        if dirty:
+            pygame.display.update(dirty)
+
+    def run(self, screen, handle_event):
+        """Sleep until an event arrives, hand it to handle_event, and redraw whatever it changed.
+        Stops once handle_event returns True"""
+        while not handle_event(pygame.event.wait()):
+            self.refresh(screen)
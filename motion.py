@@ -0,0 +1,54 @@
+"""Where a moving piece is at any frame, worked out directly instead of stepping frame by frame"""
+__version__ = '04/02/2025'
+__author__ = 'Kayla Cao'
+
+def ping_pong(start, speed, low, high, frame):
+    """Position and speed after frame steps of: move by speed, then reverse if the position is
+    outside low..high (inclusive). Matches the pieces' update() exactly, overshoot included.
+    Returns (position, speed)"""
+    if speed == 0 or frame <= 0:
+        return start, speed
+    step = abs(speed)
+    direction = 1 if speed > 0 else -1
+
+    # Count in steps from the start: positions start + step * k. a..b are the k's inside the bounds
+    a = -((start - low) // step)
+    b = (high - start) // step
+    k = 0
+
+    in_cycle = a <= b and (a <= k <= b or (k == a - 1 and direction == 1) or (k == b + 1 and direction == -1))
+    if not in_cycle:
+        if a <= k + direction <= b:
+            # the first step moves into the bounds, and it bounces back and forth from there
+            k += direction
+            frame -= 1
+        else:
+            # stuck outside the bounds: it turns around every step, flicking between two spots
+            if frame % 2:
+                return start + step * direction, -speed
+            return start, speed
+
+    # Bouncing: one lap goes up from a - 1 to b + 1 and back down, one step per frame
+    half = b - a + 2
+    if direction == 1:
+        phase = k - a + 1
+    else:
+        phase = half + (b + 1 - k)
+    phase = (phase + frame) % (2 * half)
+    if phase < half:
+        return start + step * (a - 1 + phase), step
+    return start + step * (b + 1 - (phase - half)), -step
+
+def duty_cycle(timer, is_active, active_duration, inactive_duration, frame):
+    """Timer and on/off state of a laser after frame steps. Returns (timer, is_active)"""
+    if frame <= 0:
+        return timer, is_active
+    # phase 0..active_duration is on, the rest of the lap is off
+    if is_active:
+        phase = min(timer, active_duration)
+    else:
+        phase = active_duration + 1 + min(timer, inactive_duration)
+    phase = (phase + frame) % (active_duration + inactive_duration + 2)
+    if phase <= active_duration:
+        return phase, True
+    return phase - active_duration - 1, False
@@ -0,0 +1,276 @@
+"""Steps every moving piece and laser in a level at once with NumPy, instead of one update() call per sprite"""
+__version__ = '04/02/2025'
+__author__ = 'Kayla Cao'
+
+try:
+    import numpy
+except ImportError:  # numpy is optional; levels just update their pieces one at a time
+    numpy = None
+from config import *
+from platforms import MovingPlatform
+from gamepieces import *
+
+# move_type as a number: which coordinate a piece moves along
+STILL, HORIZONTAL, VERTICAL = -1, 0, 1
+AXES = {'horizontal': HORIZONTAL, 'vertical': VERTICAL}
+
+# MovingSpike orientation as a number
+UP, DOWN, LEFT, RIGHT = range(4)
+ORIENTATIONS = {'up': UP, 'down': DOWN, 'left': LEFT, 'right': RIGHT}
+
+# Sprites this far beyond the screen (or player) get their rects written every step; the rest only live
+# in the arrays until the camera gets near them (must be more than a piece or the camera moves per step)
+SYNC_MARGIN = 256
+
+def cell_ranges(x, y, w, h, size):
+    """SpatialHash.cell_range for whole arrays of rects, as one (n, 4) array"""
+    return numpy.stack((x // size, y // size, (x + w - 1) // size, (y + h - 1) // size), axis=1)
+
+def crossed(before, after):
+    """Which pieces' cell ranges changed, so only they get re-bucketed in the spatial hash"""
+    return (before != after).any(axis=1)
+
+def near(x, w, window):
+    """Which pieces overlap a (left, right) range of world x"""
+    return (x + w > window[0]) & (x < window[1])
+
+def write_rects(sprites, x, y, mask):
+    """Copy array positions to the sprites picked by mask. Returns those sprites"""
+    indices = numpy.flatnonzero(mask)
+    written = [sprites[i] for i in indices.tolist()]
+    for sprite, left, top in zip(written, x[indices].tolist(), y[indices].tolist()):
+        sprite.rect.topleft = (left, top)
+    return written
+
+class Rects:
+    """Positions and sizes of a set of sprites as arrays. Sprite rects are only written when asked
+    for, so some can be behind the arrays (stale)"""
+    def __init__(self, sprites):
+        """initialization"""
+        self.sprites = sprites
+        self.x = numpy.array([sprite.rect.x for sprite in sprites], dtype=numpy.int64)
+        self.y = numpy.array([sprite.rect.y for sprite in sprites], dtype=numpy.int64)
+        self.w = numpy.array([sprite.rect.width for sprite in sprites], dtype=numpy.int64)
+        self.h = numpy.array([sprite.rect.height for sprite in sprites], dtype=numpy.int64)
+        self.prev_x, self.prev_y = self.x.copy(), self.y.copy()  # where each one was before the last step
+        self.moving = numpy.ones(len(sprites), dtype=bool)
+        self.stale = numpy.zeros(len(sprites), dtype=bool)
+
+    def save(self):
+        """Remember where everything is, before a step moves it"""
+        self.prev_x, self.prev_y = self.x.copy(), self.y.copy()
+
+    def cells(self, size):
+        """Grid cells each sprite covers"""
+        return cell_ranges(self.x, self.y, self.w, self.h, size)
+
+    def write(self, wanted, prev_positions):
+        """Copy positions to the wanted sprites (the ones that can be drawn or collided with);
+        the other moving ones go stale until sync() is asked for them"""
+        fresh = wanted & ~self.stale
+        self.sync(wanted, prev_positions)
+        write_rects(self.sprites, self.x, self.y, fresh)
+        self.stale = self.moving & ~wanted
+
+    def sync(self, mask, prev_positions):
+        """Bring stale sprite rects up to date (all of them, or the ones in mask). Level.save_positions
+        saved their stale rects too, so their previous positions come from the arrays instead"""
+        wanted = self.stale if mask is None else self.stale & mask
+        written = write_rects(self.sprites, self.x, self.y, wanted)
+        for sprite, left, top in zip(written, self.prev_x[wanted].tolist(), self.prev_y[wanted].tolist()):
+            if sprite in prev_positions:
+                prev_positions[sprite] = (left, top)
+        self.stale &= ~wanted
+
+class Movers(Rects):
+    """Position, size, speed and bounds of a set of moving pieces, as arrays"""
+    def __init__(self, sprites, inclusive):
+        """initialization. inclusive: the piece turns around when it reaches a bound (enemies),
+        not only once it's past it (platforms)"""
+        Rects.__init__(self, sprites)
+        self.inclusive = inclusive
+        self.speed = numpy.array([sprite.speed for sprite in sprites], dtype=numpy.int64)
+        self.axis = numpy.array([AXES.get(sprite.move_type, STILL) for sprite in sprites], dtype=numpy.int64)
+        self.low = numpy.array([sprite.left_boundary for sprite in sprites], dtype=numpy.int64)
+        self.high = numpy.array([sprite.right_boundary for sprite in sprites], dtype=numpy.int64)
+        self.horizontal = self.axis == HORIZONTAL
+        self.vertical = self.axis == VERTICAL
+        self.moving = self.axis != STILL
+
+    def move(self):
+        """Add each piece's speed along its axis"""
+        self.save()
+        self.x += numpy.where(self.horizontal, self.speed, 0)
+        self.y += numpy.where(self.vertical, self.speed, 0)
+
+    def turn_around(self):
+        """Reverse pieces that reached their bounds. Returns which ones did"""
+        if self.inclusive:
+            out_x = (self.x <= self.low) | (self.x >= self.high)
+            out_y = (self.y <= self.low) | (self.y + self.h >= self.high)
+        else:
+            out_x = (self.x < self.low) | (self.x > self.high)
+            out_y = (self.y + self.h > self.high) | (self.y < self.low)
+        turned = (self.horizontal & out_x) | (self.vertical & out_y)
+        self.speed[turned] *= -1
+        return turned
+
+    def touching(self, rect, start=0):
+        """Which pieces from start on overlap a rect"""
+        x, y, w, h = self.x[start:], self.y[start:], self.w[start:], self.h[start:]
+        return (x < rect.right) & (rect.x < x + w) & (y < rect.bottom) & (rect.y < y + h)
+
+    def write_speeds(self, turned):
+        """Speeds change rarely, so every piece that turned gets its new one"""
+        for i in numpy.flatnonzero(turned).tolist():
+            self.sprites[i].speed = int(self.speed[i])
+
+class MoverBatch:
+    """Everything in a level that changes each step, stepped with array operations"""
+    def __init__(self, level):
+        """initialization"""
+        self.level = level
+        platforms = [sprite for sprite in level.platform_list if isinstance(sprite, MovingPlatform)]
+        self.platforms = Movers(platforms, inclusive=False)
+        self.enemies = Movers([sprite for sprite in level.enemy_list if isinstance(sprite, Enemy)], inclusive=True)
+        self.unbatched = [sprite for sprite in level.enemy_list if not isinstance(sprite, Enemy)]
+
+        # Attached spikes follow a batched platform; any others update themselves
+        platform_index = {platform: i for i, platform in enumerate(platforms)}
+        self.spikes = []
+        for sprite in level.spike_list:
+            if isinstance(sprite, MovingSpike) and sprite.platform in platform_index:
+                self.spikes.append(sprite)
+            elif isinstance(sprite, MovingSpike):
+                self.unbatched.append(sprite)
+        self.spike_parent = numpy.array([platform_index[spike.platform] for spike in self.spikes], dtype=numpy.int64)
+        self.spike_side = numpy.array([ORIENTATIONS.get(spike.orientation, -1) for spike in self.spikes],
+                                      dtype=numpy.int64)
+        self.spike_rects = Rects(self.spikes)
+
+        self.lasers = list(level.laser_list)
+        self.laser_timer = numpy.array([laser.timer for laser in self.lasers], dtype=numpy.int64)
+        self.laser_active = numpy.array([laser.is_active for laser in self.lasers], dtype=bool)
+        self.active_duration = numpy.array([laser.active_duration for laser in self.lasers], dtype=numpy.int64)
+        self.inactive_duration = numpy.array([laser.inactive_duration for laser in self.lasers], dtype=numpy.int64)
+
+        self.window = None  # world x range whose sprites are all up to date
+
+    def push_player(self):
+        """Moving platforms shove the player out of the way, in the same order Group.update would"""
+        player = self.level.player
+        platforms = self.platforms
+        moving = platforms.axis != STILL
+        start = 0
+        while True:
+            hits = numpy.flatnonzero(platforms.touching(player.rect, start) & moving[start:])
+            if not hits.size:
+                return
+            i = start + int(hits[0])
+            x, y = int(platforms.x[i]), int(platforms.y[i])
+            if platforms.axis[i] == HORIZONTAL:
+                if platforms.speed[i] < 0:
+                    player.rect.right = x
+                else:
+                    player.rect.left = x + int(platforms.w[i])
+            else:
+                if platforms.speed[i] < 0:
+                    player.rect.bottom = y
+                else:
+                    player.rect.top = y + int(platforms.h[i])
+            start = i + 1  # a push can only affect platforms that update after this one
+
+    def step_spikes(self):
+        """Stick each attached spike to its side of its platform (in the arrays)"""
+        parent = self.spike_parent
+        px, py = self.platforms.x[parent], self.platforms.y[parent]
+        pw, ph = self.platforms.w[parent], self.platforms.h[parent]
+        spikes = self.spike_rects
+        spikes.save()
+        w, h, side = spikes.w, spikes.h, self.spike_side
+        centred_x = px + pw // 2 - w // 2
+        centred_y = py + ph // 2 - h // 2
+        spikes.x = numpy.select([side == UP, side == DOWN, side == LEFT, side == RIGHT],
+                                [centred_x, centred_x, px - w, px + pw], spikes.x)
+        spikes.y = numpy.select([side == UP, side == DOWN, side == LEFT, side == RIGHT],
+                                [py - h, py + ph, centred_y, centred_y], spikes.y)
+
+    def step_lasers(self):
+        """Advance every laser's timer and switch the ones whose phase ran out. Timers stay in the
+        array (only Laser.update reads them; sync() writes them back); switched lasers get their new state"""
+        self.laser_timer += 1
+        toggled = numpy.where(self.laser_active, self.laser_timer > self.active_duration,
+                              self.laser_timer > self.inactive_duration)
+        self.laser_active ^= toggled
+        self.laser_timer[toggled] = 0
+        for i in numpy.flatnonzero(toggled).tolist():
+            laser = self.lasers[i]
+            laser.timer = 0
+            laser.is_active = bool(self.laser_active[i])
+            laser.image = laser.active_image if laser.is_active else laser.inactive_image
+
+    def view_window(self):
+        """World x range around the screen (and the player, if something put it off screen)
+        whose sprites are kept up to date"""
+        left, right = self.level.camera.x, self.level.camera.x + SCREEN_WIDTH
+        player = self.level.player
+        if player is not None:
+            left, right = min(left, player.rect.left), max(right, player.rect.right)
+        return left - SYNC_MARGIN, right + SYNC_MARGIN
+
+    def sync_view(self):
+        """Write back stale sprites the screen or player could reach, in case either jumped out of
+        the range the last step kept up to date (e.g. snapping back on a lost life)"""
+        window = self.view_window()
+        if self.window is not None and self.window[0] <= window[0] and window[1] <= self.window[1]:
+            return
+        for rects in (self.platforms, self.enemies, self.spike_rects):
+            rects.sync(near(rects.x, rects.w, window), self.level.prev_positions)
+        self.window = window
+
+    def sync(self):
+        """Write everything the arrays hold back to the sprites, before the sprites update themselves again"""
+        for rects in (self.platforms, self.enemies, self.spike_rects):
+            rects.sync(None, self.level.prev_positions)
+        for laser, timer in zip(self.lasers, self.laser_timer.tolist()):
+            laser.timer = timer
+
+    def step(self):
+        """One simulation step for everything in the batch, same result as calling each update().
+        Returns the moving pieces that crossed into different grid cells and need re-bucketing.
+        Only sprites near the screen (and ones that crossed cells) get their rects written"""
+        size = self.level.grid.cell_size
+        window = self.window = self.view_window()
+        moved = []
+
+        for movers in (self.platforms, self.enemies):
+            before = movers.cells(size)
+            movers.move()
+            if movers is self.platforms and self.level.player is not None:
+                self.push_player()
+            turned = movers.turn_around()
+            crossing = crossed(before, movers.cells(size))
+            movers.write(crossing | near(movers.x, movers.w, window), self.level.prev_positions)
+            movers.write_speeds(turned)
+            moved += [movers.sprites[i] for i in numpy.flatnonzero(crossing).tolist()]
+
+        self.step_lasers()
+        if self.spikes:
+            spikes = self.spike_rects
+            before = spikes.cells(size)
+            self.step_spikes()
+            crossing = crossed(before, spikes.cells(size))
+            spikes.write(crossing | near(spikes.x, spikes.w, window), self.level.prev_positions)
+            moved += [self.spikes[i] for i in numpy.flatnonzero(crossing).tolist()]
+        for sprite in self.unbatched:
+            sprite.update()
+        moved += self.unbatched
+        return moved
+
+def batch_for(level):
+    """A MoverBatch for the level if NumPy is installed and it has enough moving pieces to be worth it"""
+    if numpy is None:
+        return None
+    if len(level.movers) + len(level.laser_list) < BATCH_MOVERS_MIN:
+        return None
+    return MoverBatch(level)
@@ -0,0 +1,192 @@
+"""Streaming percentile ranks for scores and level times, kept as small fixed-bucket histograms"""
+__version__ = '04/02/2025'
+__author__ = 'Kayla Cao'
+
+import argparse
+import bisect
+import json
+import math
+from score_db import level_name
+from score_store import write_atomically
+
+PERCENTILES_PATH = 'percentiles.json'  # kept next to the score files
+FORMAT_VERSION = 1
+
+# Scores: 50 point buckets (the best possible run is about 15500)
+SCORE_LOW = 0
+SCORE_HIGH = 20000
+SCORE_BUCKETS = 400
+
+# Level times: log spaced so every bucket is about 3% wide, from 1 second to 10 minutes
+TIME_LOW_MS = 1000
+TIME_HIGH_MS = 600000
+TIME_BUCKETS = 220
+
+class Histogram:
+    """Counts values into fixed buckets. Two histograms with the same buckets merge by adding counts,
+    so ranks never need the full history sorted"""
+    def __init__(self, low, high, buckets, log=False):
+        """initialization"""
+        self.low = low
+        self.high = high
+        self.buckets = buckets
+        self.log = log
+        # bucket i covers edges[i]..edges[i + 1]; values outside low..high land in the end buckets
+        if log:
+            step = math.log(high / low) / buckets
+            self.edges = [low * math.exp(step * i) for i in range(buckets + 1)]
+        else:
+            step = (high - low) / buckets
+            self.edges = [low + step * i for i in range(buckets + 1)]
+        self.counts = [0] * buckets
+        self.total = 0
+
+    def bucket(self, value):
+        """Which bucket a value goes in"""
+        return min(self.buckets - 1, max(0, bisect.bisect_right(self.edges, value) - 1))
+
+    def add(self, value, count=1):
+        """Record a value"""
+        self.counts[self.bucket(value)] += count
+        self.total += count
+
+    def fraction_below(self, value):
+        """Roughly what fraction of recorded values are below value (None if nothing is recorded).
+        Values are assumed to be spread evenly inside their bucket"""
+        if not self.total:
+            return None
+        i = self.bucket(value)
+        lower, upper = self.edges[i], self.edges[i + 1]
+        inside = min(1.0, max(0.0, (value - lower) / (upper - lower)))
+        return (sum(self.counts[:i]) + self.counts[i] * inside) / self.total
+
+    def quantile(self, q):
+        """The value q (0..1) of the way through the recorded values"""
+        if not self.total:
+            return None
+        target = q * self.total
+        seen = 0
+        for i, count in enumerate(self.counts):
+            if count and seen + count >= target:
+                lower, upper = self.edges[i], self.edges[i + 1]
+                return lower + (upper - lower) * (target - seen) / count
+            seen += count
+        return self.edges[-1]
+
+    def compatible(self, other):
+        """Whether two histograms have the same buckets and can be merged"""
+        return (self.low, self.high, self.buckets, self.log) == (other.low, other.high, other.buckets, other.log)
+
+    def merge(self, other):
+        """Add another histogram's counts into this one"""
+        if not self.compatible(other):
+            raise ValueError("histograms have different buckets")
+        for i, count in enumerate(other.counts):
+            self.counts[i] += count
+        self.total += other.total
+
+    def to_dict(self):
+        """For saving"""
+        return {'low': self.low, 'high': self.high, 'buckets': self.buckets, 'log': self.log,
+                'counts': self.counts}
+
+    @classmethod
+    def from_dict(cls, data):
+        """Back from to_dict"""
+        histogram = cls(data['low'], data['high'], data['buckets'], data['log'])
+        if len(data['counts']) != histogram.buckets:
+            raise ValueError("wrong number of counts")
+        histogram.counts = [int(count) for count in data['counts']]
+        histogram.total = sum(histogram.counts)
+        return histogram
+
+def score_histogram():
+    """Empty histogram for whole-game scores"""
+    return Histogram(SCORE_LOW, SCORE_HIGH, SCORE_BUCKETS)
+
+def time_histogram():
+    """Empty histogram for one level's completion times"""
+    return Histogram(TIME_LOW_MS, TIME_HIGH_MS, TIME_BUCKETS, log=True)
+
+class RunPercentiles:
+    """Score and per-level time histograms for every finished run, saved to a small JSON file"""
+    def __init__(self, path=PERCENTILES_PATH):
+        """initialization"""
+        self.path = path
+        self.histograms = {'score': score_histogram()}
+        self.load()
+
+    def histogram(self, name):
+        """The histogram called name, created empty if needed"""
+        if name not in self.histograms:
+            self.histograms[name] = score_histogram() if name == 'score' else time_histogram()
+        return self.histograms[name]
+
+    def load(self):
+        """Read the saved histograms (a missing or damaged file just starts empty)"""
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+            if data.get('version') != FORMAT_VERSION:
+                raise ValueError("unknown percentiles version")
+            for name, histogram in data['histograms'].items():
+                self.histograms[name] = Histogram.from_dict(histogram)
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            print(f"Error loading percentiles: {e}")
+
+    def save(self):
+        """Write the histograms out, replacing the old file in one step"""
+        data = {'version': FORMAT_VERSION,
+                'histograms': {name: histogram.to_dict() for name, histogram in self.histograms.items()}}
+        try:
+            write_atomically(self.path, json.dumps(data, separators=(',', ':')).encode('utf-8'))
+        except OSError as e:
+            print(f"Error saving percentiles: {e}")
+
+    def ranks(self, score, level_times):
+        """How a run compares with the runs recorded so far: the fraction of scores it beats,
+        and for each completed level the fraction of times it beats (None where there's nothing yet)"""
+        score_rank = self.histogram('score').fraction_below(score)
+        time_ranks = []
+        for level, time_ms in enumerate(level_times, start=1):
+            below = self.histogram(level_name(level)).fraction_below(time_ms)
+            time_ranks.append(None if below is None else 1 - below)  # faster beats slower
+        return score_rank, time_ranks
+
+    def record(self, score, level_times):
+        """Rank a finished run against the earlier ones, then add it. Returns the ranks"""
+        ranks = self.ranks(score, level_times)
+        self.histogram('score').add(score)
+        for level, time_ms in enumerate(level_times, start=1):
+            self.histogram(level_name(level)).add(time_ms)
+        self.save()
+        return ranks
+
+    def seed_scores(self, highscores):
+        """Fill the score histogram from an existing score history (only used the first time)"""
+        for highscore in highscores:
+            self.histogram('score').add(int(highscore.score))
+        self.save()
+
+    def merge(self, other):
+        """Fold in another machine's histograms"""
+        for name, histogram in other.histograms.items():
+            self.histogram(name).merge(histogram)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('others', nargs='*', help="percentiles files from other machines to merge in")
+    args = parser.parse_args()
+
+    percentiles = RunPercentiles()
+    for path in args.others:
+        percentiles.merge(RunPercentiles(path))
+    if args.others:
+        percentiles.save()
+    for name in sorted(percentiles.histograms):
+        histogram = percentiles.histograms[name]
+        if histogram.total:
+            p50, p90 = histogram.quantile(0.5), histogram.quantile(0.9)
+            print(f"{name}: {histogram.total} runs, median {p50:.0f}, 90th percentile {p90:.0f}")
@@ -3,6 +3,8 @@ __version__ = '04/02/2025'
 __author__ = 'Kayla Cao'
 
 import pygame
+from surface_cache import get_surface
+from motion import ping_pong
 
 class Platform(pygame.sprite.Sprite):
     """ Platform the user can jump on """
@@ -11,13 +13,13 @@ class Platform(pygame.sprite.Sprite):
         """ Platform constructor."""
         super().__init__()
 
-        self.image = pygame.Surface([width, height])
-        self.image.fill((0, 225, 0)) #green
+        self.image = get_surface((width, height), (0, 225, 0)) #green, shared with same-size platforms
 
         self.rect = self.image.get_rect()
 
 class MovingPlatform(Platform):
     """ This is a fancier platform that can actually move. """
+    moves = True  # re-bucketed in the level's spatial hash every update
 
     def __init__(self, x, y, width, height, boundary1, boundary2, speed, move_type):
         """initialization"""
@@ -38,6 +40,27 @@ class MovingPlatform(Platform):
         self.rect.x = x
         self.rect.y = y
 
+        # Where it started, so its position at any frame can be worked out directly
+        self.start_x = x
+        self.start_y = y
+        self.start_speed = speed
+
+    def state_at(self, frame):
+        """(x, y, speed) frame steps after the platform was made, without stepping there"""
+        if self.move_type == 'horizontal':
+            x, speed = ping_pong(self.start_x, self.start_speed, self.left_boundary, self.right_boundary, frame)
+            return x, self.start_y, speed
+        elif self.move_type == 'vertical':
+            y, speed = ping_pong(self.start_y, self.start_speed, self.top_boundary,
+                                 self.bottom_boundary - self.rect.height, frame)
+            return self.start_x, y, speed
+        return self.start_x, self.start_y, self.start_speed
+
+    def seek(self, frame):
+        """Jump straight to where the platform is at a frame (doesn't push the player)"""
+        x, y, self.speed = self.state_at(frame)
+        self.rect.topleft = (x, y)
+
     def update(self):
         """ Move the platform. """
         if self.move_type == 'horizontal':
@@ -53,7 +76,7 @@ class MovingPlatform(Platform):
                     self.player.rect.left = self.rect.right
 
             # Check horizontal boundaries
-            cur_pos = self.rect.x - self.level.world_shift
+            cur_pos = self.rect.x  # pieces stay in world coordinates
             if cur_pos < self.left_boundary or cur_pos > self.right_boundary:
                 self.speed *= -1
 
@@ -6,30 +6,33 @@ import pygame
 from config import *
 from platforms import *
 from sounds import *
+from sprite_frames import SpriteFrames
 
 class Player(pygame.sprite.Sprite):
     """The player!! The heart of the game!"""
-    def __init__(self):
-        """initialization"""
+    def __init__(self, headless=False):
+        """initialization. headless players need no window or audio device"""
         super().__init__()
 
-        self.sound_manager = SoundManager()
+        self.headless = headless
+        self.sound_manager = SilentSoundManager() if headless else SoundManager()
 
-        # Load the entire sprite sheet
-        sprite_sheet = pygame.image.load('images/player_sprite_sheet.png').convert_alpha()
-        # Sprite dimensions in the original sheet
-
-        #sprite positions
-        self.idle_sprite = self.get_sprite_from_sheet(sprite_sheet, 0, 0, 75, 150)
-        self.run_right_sprite = self.get_sprite_from_sheet(sprite_sheet, 0, 160, 110, 120)
-        self.run_left_sprite = pygame.transform.flip(self.run_right_sprite, True, False)
-        self.jump_sprite = self.get_sprite_from_sheet(sprite_sheet, 170, 0, 60, 140)
+        # Load the entire sprite sheet (headless players are never drawn, so skip it)
+        if headless:
+            sprite_sheet = None
+        else:
+            sprite_sheet = pygame.image.load('images/player_sprite_sheet.png').convert_alpha()
 
         self.width = 20
         self.height = 35
 
+        # every pose is scaled once here instead of every frame
+        self.frames = SpriteFrames(sprite_sheet, self.width, self.height)
+        self.pose = 'idle'
+        self.faded = False
+
         #initial image
-        self.image = pygame.transform.scale(self.idle_sprite, (self.width, self.height))
+        self.image = self.frames.get(self.pose)
         self.rect = self.image.get_rect()
 
         self.level = None
@@ -59,6 +62,8 @@ class Player(pygame.sprite.Sprite):
         self.score = 0
         self.gold_count = 0
         self.level_gold_count = [0, 0, 0]
+        self.collected_gold = []  # (level, gold) in the order they were picked up, so a rewind can put them back
+        self.scoring = None  # the run's ScoreEngine, if anything is keeping score
 
         # Start with 3 lives
         self.initial_lives = 3
@@ -69,12 +74,12 @@ class Player(pygame.sprite.Sprite):
         self.respawn_timer = 0
         self.flash_duration = 60  # Flash for 60 frames (1 second at 60 FPS)
 
-    def get_sprite_from_sheet(self, sheet, x, y, width, height):
-        """Extract a specific sprite from a sprite sheet"""
-        # Extract the sprite
-        sprite = sheet.subsurface((x, y, width, height))
-
-        return sprite
+    def set_pose(self, pose, faded=None):
+        """Swap to a cached pose image (no scaling happens here)"""
+        if faded is not None:
+            self.faded = faded
+        self.pose = pose
+        self.image = self.frames.get(pose, self.faded)
 
     def reset_lives(self):
         """Reset lives to initial value"""
@@ -84,6 +89,7 @@ class Player(pygame.sprite.Sprite):
         """ Collect gold and increase score """
 
         self.gold_count += 1
+        self.collected_gold.append((self.level, gold))
 
         if current_level_no == 0:
             self.level_gold_count[0] += 1
@@ -92,6 +98,9 @@ class Player(pygame.sprite.Sprite):
         elif current_level_no == 2:
             self.level_gold_count[2] += 1
 
+        if self.scoring:
+            self.scoring.gold_collected(current_level_no)
+
         self.sound_manager.play_gold_collect()  # play sound
         gold.kill()  # Remove gold from all sprite groups
 
@@ -99,13 +108,13 @@ class Player(pygame.sprite.Sprite):
         """updates the player"""
         # Determine sprite based on movement and jump state
         if self.v_speed != 0:  # Jumping or falling
-            self.image = pygame.transform.scale(self.jump_sprite, (self.width, self.height))
+            self.set_pose('jump')
         elif self.h_speed > 0:
-            self.image = pygame.transform.scale(self.run_right_sprite, (self.width, self.height))
+            self.set_pose('run_right')
         elif self.h_speed < 0:
-            self.image = pygame.transform.scale(self.run_left_sprite, (self.width, self.height))
+            self.set_pose('run_left')
         else:
-            self.image = pygame.transform.scale(self.idle_sprite, (self.width, self.height))
+            self.set_pose('idle')
 
         # Reset jump flags at the beginning of each update
         self.can_jump = False
@@ -131,7 +140,7 @@ class Player(pygame.sprite.Sprite):
         self.can_wall_jump = False
 
         # Check horizontal collisions
-        block_hit_list = pygame.sprite.spritecollide(self, self.level.platform_list, False)
+        block_hit_list = self.level.collide(self, self.level.platform_list)
 
         # If there are any collisions, you can wall jump
         if block_hit_list:
@@ -150,7 +159,7 @@ class Player(pygame.sprite.Sprite):
         self.rect.y += self.v_speed
 
         # Check vertical collisions
-        block_hit_list = pygame.sprite.spritecollide(self, self.level.platform_list, False)
+        block_hit_list = self.level.collide(self, self.level.platform_list)
         if len(block_hit_list) > 0:
             self.can_jump = True
 
@@ -171,27 +180,27 @@ class Player(pygame.sprite.Sprite):
                 self.v_speed = 0
 
         # Check laser collision
-        for laser in self.level.laser_list:
-            if pygame.sprite.collide_rect(self, laser) and laser.is_active:
+        for laser in self.level.collide(self, self.level.laser_list):
+            if laser.is_active:
                 self.caught()
 
-        # Check spike collision
-        if pygame.sprite.spritecollideany(self, self.level.spike_list):
+        # Check spike collision (against the spike's triangle, not its rect)
+        if self.level.collide_any_exact(self, self.level.spike_list):
             self.caught()
 
         # Check gold collision
-        gold_hit = pygame.sprite.spritecollideany(self, self.level.gold_list)
+        gold_hit = self.level.collide_any(self, self.level.gold_list)
         if gold_hit:
             self.collect_gold(gold_hit, current_level_no)
 
         # Check bouncepad collision
-        bouncepad_hit = pygame.sprite.spritecollideany(self, self.level.bouncepad_list)
+        bouncepad_hit = self.level.collide_any(self, self.level.bouncepad_list)
         if bouncepad_hit and self.v_speed > 0:  # Only bounce when falling onto the pad
             self.sound_manager.play_bouncepad() #play sound
             self.v_speed = bouncepad_hit.bounce_strength  # Apply bounce
 
         # Check enemy collision
-        if pygame.sprite.spritecollideany(self, self.level.enemy_list):
+        if self.level.collide_any(self, self.level.enemy_list):
             self.caught()
 
         # Screen boundary checks
@@ -209,14 +218,14 @@ class Player(pygame.sprite.Sprite):
             # Flash the player (alternate visibility every few frames)
             self.respawn_timer += 1
             if self.respawn_timer % 10 < 5:  # Toggle every 5 frames
-                self.image.set_alpha(128)  # Semi-transparent
+                self.set_pose(self.pose, faded=True)  # Semi-transparent
             else:
-                self.image.set_alpha(255)  # Fully visible
+                self.set_pose(self.pose, faded=False)  # Fully visible
 
             # End the flashing effect after the duration
             if self.respawn_timer >= self.flash_duration:
                 self.is_respawning = False
-                self.image.set_alpha(255)  # Ensure player is fully visible
+                self.set_pose(self.pose, faded=False)  # Ensure player is fully visible
 
             # reset movement
             self.h_speed = 0
@@ -232,7 +241,7 @@ class Player(pygame.sprite.Sprite):
     def jump(self):
         """lets player both jump and wall jump"""
         if self.can_wall_jump or self.can_jump:
-            self.image = pygame.transform.scale(self.jump_sprite, (self.width, self.height))
+            self.set_pose('jump')
         if self.can_wall_jump:
             # Wall jump - give a strong push away from the wall
             # Apply a horizontal impulse away from the wall
@@ -252,12 +261,12 @@ class Player(pygame.sprite.Sprite):
     def go_left(self):
         """ Move player left """
         self.h_speed = -self.max_h_speed
-        self.image = pygame.transform.scale(self.run_left_sprite, (self.width, self.height))
+        self.set_pose('run_left')
 
     def go_right(self):
         """ Move player right """
         self.h_speed = self.max_h_speed
-        self.image = pygame.transform.scale(self.run_right_sprite, (self.width, self.height))
+        self.set_pose('run_right')
 
     def stop(self):
         """ Stop horizontal movement when user lets go of keyboard"""
@@ -267,17 +276,15 @@ class Player(pygame.sprite.Sprite):
         """ Reset player position when caught """
         self.sound_manager.play_lose_life() #play sound
 
-        # Store the current world shift
-        current_world_shift = self.level.world_shift
-
-        # Reset all platforms and objects by shifting the world back to original position
-        if current_world_shift != 0:
-            self.level.shift_world(-current_world_shift)
-            self.level.world_shift = 0
+        # Reset the view by moving the camera back to the start of the level
+        if self.level.camera.x != 0:
+            self.level.camera.reset()
 
             # Reduce lives only if not already at 0
             if self.lives > 0:
                 self.lives -= 1
+                if self.scoring:
+                    self.scoring.life_lost()
 
             # Visual feedback - make player flash briefly
             self.is_respawning = True
@@ -0,0 +1,186 @@
+"""Times each phase of the game loop so we know where frame time actually goes"""
+__version__ = '04/02/2025'
+__author__ = 'Kayla Cao'
+
+import json
+import time
+from array import array
+import pygame
+from config import SIMULATION_HZ, RENDER_FPS
+
+# Phases of one frame, in the order they run
+EVENTS, INPUT, PLAYER, LEVEL, SCROLL, CHECKS, DRAW, FLIP = range(8)
+PHASE_NAMES = ('events', 'input', 'player update', 'level update', 'scrolling',
+               'gold/level checks', 'draw', 'flip')
+
+# Phases that run once per simulation step (zero, one or several times a frame); the rest run once per frame
+STEP_PHASES = (INPUT, PLAYER, LEVEL, SCROLL, CHECKS)
+
+HISTORY_SECONDS = 10  # how far back the timings go
+OVERLAY_REFRESH = 30  # frames between overlay re-renders
+
+class PhaseRing:
+    """Start and duration of each phase for the last few frames (or steps), in flat ring buffers"""
+    def __init__(self, size):
+        """initialization"""
+        self.size = size
+        phases = len(PHASE_NAMES)
+        # slot * phases + phase
+        self.starts = array('q', bytes(8 * size * phases))  # ns since the profiler started
+        self.durations = array('q', bytes(8 * size * phases))  # ns
+        self.slot = 0  # where the current frame/step goes
+        self.count = 0  # frames/steps recorded so far
+
+    def begin(self):
+        """Clear the current slot for a new frame/step"""
+        base = self.slot * len(PHASE_NAMES)
+        for i in range(base, base + len(PHASE_NAMES)):
+            self.starts[i] = 0
+            self.durations[i] = 0
+
+    def advance(self):
+        """Move on to the next slot"""
+        self.slot = (self.slot + 1) % self.size
+        self.count += 1
+
+    def charge(self, phase, start, duration):
+        """Add time to a phase in the current slot, keeping its first start"""
+        i = self.slot * len(PHASE_NAMES) + phase
+        if not self.durations[i]:
+            self.starts[i] = start
+        self.durations[i] += duration
+
+    def recorded_slots(self):
+        """Slots that hold finished frames/steps, oldest first"""
+        if self.count < self.size:
+            return range(self.count)
+        return [(self.slot + i) % self.size for i in range(self.size)]
+
+    def samples(self, phase):
+        """A phase's recorded durations (ns), oldest first"""
+        return [self.durations[slot * len(PHASE_NAMES) + phase] for slot in self.recorded_slots()]
+
+class FrameProfiler:
+    """Records how long each phase took into fixed-size ring buffers: one slot per frame for the
+    per-frame phases, and one per simulation step for the step phases, so frames that ran no step
+    don't count as zero-time steps"""
+    def __init__(self, seconds=HISTORY_SECONDS, fps=RENDER_FPS):
+        """initialization (fps is the rate frames are drawn at, to size the frame buffer)"""
+        self.frame_ring = PhaseRing(int(seconds * fps))
+        self.step_ring = PhaseRing(int(seconds * SIMULATION_HZ))
+        self.in_step = False  # the step ring's current slot has a step in it
+        self.origin = time.perf_counter_ns()
+        self.last = self.origin
+
+        # on-screen overlay
+        self.visible = False
+        self.font = None
+        self.overlay_image = None
+        self.overlay_rect = None
+        self.frames_since_refresh = 0
+
+    def begin_frame(self):
+        """Start timing a new frame"""
+        self.frame_ring.begin()
+        self.last = time.perf_counter_ns()
+
+    def lap(self, phase):
+        """Charge the time since the last lap to a phase. INPUT is the first phase of a step,
+        so it starts a new step slot"""
+        now = time.perf_counter_ns()
+        if phase in STEP_PHASES:
+            ring = self.step_ring
+            if phase == INPUT:
+                if self.in_step:
+                    ring.advance()
+                ring.begin()
+                self.in_step = True
+        else:
+            ring = self.frame_ring
+        ring.charge(phase, self.last - self.origin, now - self.last)
+        self.last = now
+
+    def skip(self):
+        """Don't charge the time since the last lap to anything (e.g. waiting on the clock)"""
+        self.last = time.perf_counter_ns()
+
+    def end_frame(self):
+        """Finish the frame and move on to the next slot. A step that ran this frame is done too"""
+        self.frame_ring.advance()
+        if self.in_step:
+            self.step_ring.advance()
+            self.in_step = False
+        self.frames_since_refresh += 1
+
+    def ring_for(self, phase):
+        """The ring buffer a phase is recorded in"""
+        return self.step_ring if phase in STEP_PHASES else self.frame_ring
+
+    def percentiles(self, phase):
+        """(p50, p99) of a phase's time per frame (per step for the step phases), in ms"""
+        samples = sorted(self.ring_for(phase).samples(phase))
+        if not samples:
+            return 0.0, 0.0
+        p50 = samples[len(samples) // 2]
+        p99 = samples[min(len(samples) - 1, len(samples) * 99 // 100)]
+        return p50 / 1e6, p99 / 1e6
+
+    def toggle_overlay(self):
+        """Show/hide the overlay. Returns the screen area that needs redrawing"""
+        self.visible = not self.visible
+        self.frames_since_refresh = OVERLAY_REFRESH
+        dirty = self.overlay_rect
+        self.overlay_image = None
+        self.overlay_rect = None
+        return [dirty] if dirty else []
+
+    def update_overlay(self, screen_width):
+        """Re-render the overlay every so often. Returns the screen areas that changed"""
+        if not self.visible or self.frames_since_refresh < OVERLAY_REFRESH:
+            return []
+        self.frames_since_refresh = 0
+        if self.font is None:
+            self.font = pygame.font.Font(None, 22)
+
+        lines = ['phase              p50 ms   p99 ms']  # step phases are per step, the rest per frame
+        for phase, name in enumerate(PHASE_NAMES):
+            p50, p99 = self.percentiles(phase)
+            lines.append(f"{name:<18} {p50:7.2f}  {p99:7.2f}")
+        rendered = [self.font.render(line, True, (255, 255, 255)) for line in lines]
+
+        width = max(image.get_width() for image in rendered) + 10
+        height = sum(image.get_height() for image in rendered) + 10
+        image = pygame.Surface((width, height))
+        image.fill((0, 0, 0))
+        y = 5
+        for line in rendered:
+            image.blit(line, (5, y))
+            y += line.get_height()
+
+        old_rect = self.overlay_rect
+        self.overlay_image = image
+        self.overlay_rect = image.get_rect(topright=(screen_width - 10, 10))
+        return [self.overlay_rect.union(old_rect) if old_rect else self.overlay_rect]
+
+    def draw(self, screen):
+        """Blit the overlay if it's showing"""
+        if self.visible and self.overlay_image is not None:
+            screen.blit(self.overlay_image, self.overlay_rect)
+
+    def export_chrome_trace(self, path):
+        """Writes the recorded frames and steps as a Chrome trace (open in chrome://tracing or Perfetto).
+        A frame phase that ran several times in one frame shows up once, at its first start, with its total time"""
+        events = []
+        frame_phases = [phase for phase in range(len(PHASE_NAMES)) if phase not in STEP_PHASES]
+        for ring, phases in ((self.frame_ring, frame_phases), (self.step_ring, STEP_PHASES)):
+            for slot in ring.recorded_slots():
+                base = slot * len(PHASE_NAMES)
+                for phase in phases:
+                    duration = ring.durations[base + phase]
+                    if duration:
+                        events.append({'name': PHASE_NAMES[phase], 'ph': 'X', 'pid': 0, 'tid': 0,
+                                       'ts': ring.starts[base + phase] / 1000, 'dur': duration / 1000})
+        events.sort(key=lambda event: event['ts'])
+        with open(path, 'w') as f:
+            json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, f)
+        return len(events)
@@ -0,0 +1,144 @@
+"""Draws a level from cached background tiles and only updates the parts of the screen that changed"""
+__version__ = '04/02/2025'
+__author__ = 'Kayla Cao'
+
+import pygame
+from config import *
+from atlas import Atlas
+
+TILE_WIDTH = 256  # tiles are full-height columns since the camera only scrolls sideways
+BACKGROUND_COLOR = (100, 125, 150)  # Dark bluish-gray room color
+
+class LevelRenderer:
+    """Bakes static pieces and text into tiles and redraws moving pieces through dirty rects"""
+    def __init__(self, level):
+        """initialization"""
+        self.level = level
+        self.tiles = {}  # column -> Surface with the level's static pieces baked in
+        self.offset = None  # camera offset the screen was last drawn at (None = needs full redraw)
+        self.drawn = {}  # sprite -> (screen rect, image) from the last frame
+        self.atlas = None  # every piece image packed together, built on the first draw
+
+    def static_groups(self):
+        """Groups whose pieces never move, in the order they are drawn"""
+        level = self.level
+        return (level.platform_list, level.spike_list, level.gold_list, level.bouncepad_list)
+
+    def build_atlas(self):
+        """Pack every distinct image the level's pieces can show (lasers have two)"""
+        level = self.level
+        images = []
+        for group in (level.platform_list, level.spike_list, level.gold_list, level.bouncepad_list,
+                      level.enemy_list, level.laser_list):
+            for piece in group:
+                images.append(piece.image)
+                if hasattr(piece, 'active_image'):
+                    images.extend((piece.active_image, piece.inactive_image))
+        self.atlas = Atlas(images)
+
+    def dynamic_sprites(self, extra_sprites):
+        """Everything that moves or changes its image, in draw order"""
+        level = self.level
+        sprites = [sprite for sprite in level.platform_list if sprite in level.movers]
+        sprites.extend(level.enemy_list)
+        sprites.extend(level.laser_list)
+        sprites.extend(sprite for sprite in level.spike_list if sprite in level.movers)
+        sprites.extend(extra_sprites)
+        return sprites
+
+    def build_tile(self, column):
+        """Bake every static piece and text that overlaps one tile"""
+        tile = pygame.Surface((TILE_WIDTH, SCREEN_HEIGHT))
+        if pygame.display.get_surface() is not None:
+            tile = tile.convert()
+        tile.fill(BACKGROUND_COLOR)
+
+        left = column * TILE_WIDTH
+        area = pygame.Rect(left, 0, TILE_WIDTH, SCREEN_HEIGHT)
+        nearby = self.level.grid.query(area)
+        pieces = [piece for group in self.static_groups() for piece in nearby
+                  if piece in group and piece not in self.level.movers]
+        tile.blits(self.atlas.blit_list(pieces, [piece.rect.move(-left, 0) for piece in pieces]), False)
+
+        for text_surf, text_rect in self.level.text_list:
+            if text_rect.colliderect(area):
+                tile.blit(text_surf, text_rect.move(-left, 0))
+        return tile
+
+    def visible_columns(self, offset):
+        """Tile columns that show up on screen at this camera offset"""
+        return range(offset // TILE_WIDTH, (offset + SCREEN_WIDTH - 1) // TILE_WIDTH + 1)
+
+    def draw_background(self, screen, offset, clip=None):
+        """Blit the visible tiles, building any the camera just scrolled into"""
+        if clip is not None:
+            screen.set_clip(clip)
+        for column in self.visible_columns(offset):
+            tile = self.tiles.get(column)
+            if tile is None:
+                tile = self.tiles[column] = self.build_tile(column)
+            screen.blit(tile, (column * TILE_WIDTH - offset, 0))
+        if clip is not None:
+            screen.set_clip(None)
+
+    def drop_far_tiles(self, offset):
+        """Forget tiles well off screen so long levels don't pile up memory"""
+        columns = self.visible_columns(offset)
+        keep = range(columns.start - 1, columns.stop + 1)
+        for column in [column for column in self.tiles if column not in keep]:
+            del self.tiles[column]
+
+    def invalidate(self, rect):
+        """A static piece changed (e.g. gold collected): rebuild the tiles it was on"""
+        first = rect.left // TILE_WIDTH
+        last = (rect.right - 1) // TILE_WIDTH
+        for column in range(first, last + 1):
+            self.tiles.pop(column, None)
+        self.offset = None
+
+    def draw(self, screen, alpha, extra_sprites=(), extra_dirty=(), overlay=None):
+        """Draw the level. Returns the screen rects that changed, or None if the whole screen did.
+        extra_dirty are screen areas the overlay (the HUD) changed; overlay(screen) is drawn on top"""
+        level = self.level
+        if self.atlas is None:
+            self.build_atlas()
+        offset = level.camera.view_x(alpha)
+        sprites = self.dynamic_sprites(extra_sprites)
+
+        now = {}
+        for sprite in sprites:
+            x, y = level.screen_pos(sprite, alpha, offset)
+            now[sprite] = (pygame.Rect(x, y, sprite.rect.width, sprite.rect.height), sprite.image)
+
+        # Scrolled (or first frame): redraw everything
+        if offset != self.offset:
+            self.draw_background(screen, offset)
+            screen.blits(self.atlas.blit_list(sprites, [now[sprite][0] for sprite in sprites]), False)
+            if overlay is not None:
+                overlay(screen)
+            self.drop_far_tiles(offset)
+            self.offset = offset
+            self.drawn = now
+            return None
+
+        # Camera still: repaint only where something changed
+        dirty = [pygame.Rect(rect) for rect in extra_dirty]
+        for sprite in sprites:
+            if self.drawn.get(sprite) != now[sprite]:
+                dirty.append(now[sprite][0])
+        for sprite, (rect, image) in self.drawn.items():
+            if now.get(sprite) != (rect, image):
+                dirty.append(rect)
+        self.drawn = now
+
+        # Each area is repainted from scratch (background, pieces, overlay), so overlapping
+        # areas never blend anything twice
+        for area in dirty:
+            self.draw_background(screen, offset, area)
+            screen.set_clip(area)
+            touching = [sprite for sprite in sprites if now[sprite][0].colliderect(area)]
+            screen.blits(self.atlas.blit_list(touching, [now[sprite][0] for sprite in touching]), False)
+            if overlay is not None:
+                overlay(screen)
+            screen.set_clip(None)
+        return dirty
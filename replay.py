@@ -0,0 +1,137 @@
+"""Records the keys pressed each simulation step into a tiny file and plays them back exactly"""
+__version__ = '04/02/2025'
+__author__ = 'Kayla Cao'
+
+import json
+import os
+import struct
+import sys
+import time
+from config import *
+from simulation import Simulation
+
+# Input bits for one simulation step
+LEFT = 1
+RIGHT = 2
+JUMP = 4  # jump key pressed since the last step
+
+MAGIC = b'VFPR'
+FORMAT_VERSION = 1
+HEADER = struct.Struct('<4sBBIH')  # magic, version, steps per second, step count, info length
+
+def to_mask(left, right, jump):
+    """Packs one step's inputs into a bitmask"""
+    return (LEFT if left else 0) | (RIGHT if right else 0) | (JUMP if jump else 0)
+
+def write_varint(out, value):
+    """Appends an unsigned LEB128 integer"""
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+def read_varint(data, pos):
+    """Reads an unsigned LEB128 integer, returns (value, new position)"""
+    value = 0
+    shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, pos
+        shift += 7
+
+def encode_inputs(masks):
+    """Run-length encodes step masks: each run is one varint of (length << 3 | mask)"""
+    out = bytearray()
+    run_mask = None
+    run_length = 0
+    for mask in masks:
+        if mask == run_mask:
+            run_length += 1
+        else:
+            if run_length:
+                write_varint(out, (run_length << 3) | run_mask)
+            run_mask = mask
+            run_length = 1
+    if run_length:
+        write_varint(out, (run_length << 3) | run_mask)
+    return bytes(out)
+
+def decode_inputs(data, pos=0):
+    """Expands run-length encoded step masks back into a list"""
+    masks = []
+    while pos < len(data):
+        value, pos = read_varint(data, pos)
+        masks.extend([value & 7] * (value >> 3))
+    return masks
+
+class InputRecorder:
+    """Collects the inputs fed into each simulation step"""
+    def __init__(self):
+        """initialization"""
+        self.masks = []
+
+    def record(self, left, right, jump):
+        """Remember one step's inputs"""
+        self.masks.append(to_mask(left, right, jump))
+
+    def truncate(self, frames):
+        """Forget the inputs after the first frames steps (they were rewound)"""
+        del self.masks[frames:]
+
+    def save(self, path, info=None):
+        """Writes the recording (plus an optional info dict) to a replay file"""
+        save_replay(path, self.masks, info)
+
+def save_replay(path, masks, info=None):
+    """Writes step masks and an info dict to a replay file"""
+    info_bytes = json.dumps(info or {}, separators=(',', ':')).encode()
+    header = HEADER.pack(MAGIC, FORMAT_VERSION, SIMULATION_HZ, len(masks), len(info_bytes))
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, 'wb') as f:
+        f.write(header + info_bytes + encode_inputs(masks))
+
+def load_replay(path):
+    """Reads a replay file, returns (step masks, info dict)"""
+    with open(path, 'rb') as f:
+        data = f.read()
+    magic, version, hz, steps, info_length = HEADER.unpack_from(data)
+    if magic != MAGIC or version != FORMAT_VERSION:
+        raise ValueError(f"{path} is not a replay file this game can read")
+    if hz != SIMULATION_HZ:
+        raise ValueError(f"{path} was recorded at {hz} Hz, the game runs at {SIMULATION_HZ} Hz")
+    pos = HEADER.size
+    info = json.loads(data[pos:pos + info_length])
+    masks = decode_inputs(data, pos + info_length)
+    if len(masks) != steps:
+        raise ValueError(f"{path} is truncated: expected {steps} steps, found {len(masks)}")
+    return masks, info
+
+def run_replay(masks, sim=None):
+    """Feeds recorded inputs back through a (headless by default) simulation"""
+    if sim is None:
+        sim = Simulation(headless=True)
+    for mask in masks:
+        if sim.game_over:
+            break
+        sim.step(mask & LEFT, mask & RIGHT, mask & JUMP)
+    return sim
+
+def new_replay_path():
+    """Somewhere to save the run that's about to start"""
+    return os.path.join(REPLAY_DIR, time.strftime('%Y%m%d-%H%M%S') + '.vfpr')
+
+if __name__ == "__main__":
+    for replay_path in sys.argv[1:]:
+        replay_masks, replay_info = load_replay(replay_path)
+        start = time.perf_counter()
+        result = run_replay(replay_masks)
+        elapsed = time.perf_counter() - start
+        print(f"{replay_path}: {len(replay_masks)} steps, {os.path.getsize(replay_path)} bytes, "
+              f"{len(replay_masks) / SIMULATION_HZ / elapsed:.0f}x real time")
+        print(f"  levels completed: {result.current_level_no}, gold: {result.player.level_gold_count}, "
+              f"lives: {result.player.lives}")
@@ -0,0 +1,144 @@
+"""Hold-to-rewind: a ring buffer of game snapshots, stored as small deltas against periodic keyframes"""
+__version__ = '04/02/2025'
+__author__ = 'Kayla Cao'
+
+from array import array
+from collections import deque
+from config import *
+
+# Player attributes saved in every snapshot, and the type each comes back as
+PLAYER_FIELDS = (
+    ('h_speed', int), ('v_speed', float), ('gravity', float),
+    ('wall_direction', int), ('can_wall_jump', bool), ('can_jump', bool), ('wall_jump_timer', int),
+    ('score', int), ('gold_count', int), ('lives', int),
+    ('is_respawning', bool), ('respawn_timer', int), ('faded', bool),
+)
+SCORING_FIELDS = (('score', int), ('frame', int), ('gold_count', int), ('lives_lost', int), ('levels_completed', int))
+
+class RewindBuffer:
+    """The last few seconds of a Simulation, one snapshot per step.
+
+    A snapshot is a flat list of numbers. Every keyframe_interval steps the whole list is kept
+    (a keyframe); the steps in between only keep the numbers that differ from their keyframe, so
+    restoring any step is one keyframe copy plus one short patch. Moving pieces and lasers are a
+    function of their level's frame count (see Level.seek), so one number covers all of them, and
+    collected gold is a count into the player's log of pickups."""
+    def __init__(self, seconds=REWIND_SECONDS, keyframe_interval=REWIND_KEYFRAME_INTERVAL):
+        """initialization"""
+        self.snapshots = deque(maxlen=int(seconds * SIMULATION_HZ))  # (keyframe, delta), oldest first
+        self.keyframe_interval = keyframe_interval
+        self.keyframe = None
+        self.since_keyframe = 0
+        self.poses = []  # pose names, so a pose fits in a snapshot as a number
+
+    def __len__(self):
+        """How many steps can be rewound"""
+        return len(self.snapshots)
+
+    def pose_number(self, pose):
+        """The pose as an index into self.poses"""
+        if pose not in self.poses:
+            self.poses.append(pose)
+        return self.poses.index(pose)
+
+    def capture(self, sim):
+        """The simulation's state as a list of numbers"""
+        player = sim.player
+        scoring = sim.scoring
+        values = [getattr(player, name) for name, kind in PLAYER_FIELDS]
+        values += [player.rect.x, player.rect.y, self.pose_number(player.pose)]
+        values += player.level_gold_count
+        values += [sim.frame, sim.current_level_no, len(sim.level_start_times), len(sim.level_end_times),
+                   len(player.collected_gold)]
+        values += sim.level_gold_count
+        for level in sim.level_list:
+            values += [level.frames, level.camera.x]
+        values += [getattr(scoring, name) for name, kind in SCORING_FIELDS]
+        values += scoring.level_gold
+        values.append(len(scoring.events))
+        return values
+
+    def push(self, sim):
+        """Save the simulation's state (call before each step)"""
+        values = array('d', self.capture(sim))
+        if self.keyframe is None or self.since_keyframe >= self.keyframe_interval:
+            self.keyframe = values
+            self.since_keyframe = 0
+            delta = None
+        else:
+            # (index, value) pairs for whatever changed since the keyframe
+            delta = array('d')
+            for i, (old, new) in enumerate(zip(self.keyframe, values)):
+                if old != new:
+                    delta.append(i)
+                    delta.append(new)
+        self.snapshots.append((self.keyframe, delta))
+        self.since_keyframe += 1
+
+    def rewind(self, sim):
+        """Put the simulation back one step. Returns False if there's nothing left to rewind"""
+        if not self.snapshots:
+            return False
+        keyframe, delta = self.snapshots.pop()
+        values = array('d', keyframe)
+        if delta is not None:
+            for i in range(0, len(delta), 2):
+                values[int(delta[i])] = delta[i + 1]
+        self.restore(sim, values)
+
+        # start a fresh keyframe on the next push, so new deltas are against a nearby state
+        self.keyframe = None
+        return True
+
+    def restore(self, sim, values):
+        """Set the simulation to a captured state"""
+        values = iter(values)
+        player = sim.player
+        scoring = sim.scoring
+        for name, kind in PLAYER_FIELDS:
+            setattr(player, name, kind(next(values)))
+        player.rect.x = int(next(values))
+        player.rect.y = int(next(values))
+        player.set_pose(self.poses[int(next(values))], player.faded)
+        player.level_gold_count[:] = [int(next(values)) for count in player.level_gold_count]
+
+        sim.frame = int(next(values))
+        sim.current_level_no = int(next(values))
+        del sim.level_start_times[int(next(values)):]
+        del sim.level_end_times[int(next(values)):]
+        gold_left = int(next(values))
+        sim.level_gold_count[:] = [int(next(values)) for count in sim.level_gold_count]
+        for level in sim.level_list:
+            frames = int(next(values))
+            if frames != level.frames:
+                level.seek(frames)
+            level.camera.x = int(next(values))
+
+        for name, kind in SCORING_FIELDS:
+            setattr(scoring, name, kind(next(values)))
+        scoring.level_gold[:] = [int(next(values)) for count in scoring.level_gold]
+        del scoring.events[int(next(values)):]
+
+        # Put back gold picked up after this step, most recent first
+        while len(player.collected_gold) > gold_left:
+            level, gold = player.collected_gold.pop()
+            level.gold_list.add(gold)
+
+        sim.game_over = False
+        level = sim.level_list[sim.current_level_no]
+        if level is not sim.current_level:
+            # rewound into another level: the screen still shows the one we came from
+            level.invalidate_view()
+        sim.current_level = level
+        player.level = level
+        # nothing to blend from: draw exactly the restored state
+        sim.current_level.save_positions()
+
+    def nbytes(self):
+        """Roughly how much memory the snapshots take"""
+        keyframes = {id(keyframe): keyframe for keyframe, delta in self.snapshots}
+        total = sum(keyframe.buffer_info()[1] * keyframe.itemsize for keyframe in keyframes.values())
+        for keyframe, delta in self.snapshots:
+            if delta is not None:
+                total += delta.buffer_info()[1] * delta.itemsize
+        return total
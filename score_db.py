@@ -0,0 +1,107 @@
+"""Optional SQLite leaderboard: whole-game scores plus per-level best times, shareable by several cabinets"""
+__version__ = '04/02/2025'
+__author__ = 'Kayla Cao'
+
+import sqlite3
+import time
+from HighScore import HighScore
+from score_store import LEGACY_PATH, parse_legacy_scores
+
+DATABASE_PATH = 'scores.db'
+BUSY_TIMEOUT_MS = 5000  # how long a writer waits for another process's transaction
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    initials TEXT NOT NULL,
+    score INTEGER NOT NULL,
+    saved_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS runs_by_score ON runs (score DESC, id);
+
+CREATE TABLE IF NOT EXISTS level_times (
+    run_id INTEGER NOT NULL REFERENCES runs (id),
+    level INTEGER NOT NULL,
+    time_ms REAL NOT NULL,
+    PRIMARY KEY (run_id, level)
+);
+CREATE INDEX IF NOT EXISTS level_times_by_time ON level_times (level, time_ms, run_id);
+'''
+
+def level_name(level):
+    """1 -> 'Level_01', matching the level class names"""
+    return f"Level_{level:02d}"
+
+class SQLiteScoreStore:
+    """High score store backed by sqlite3 in WAL mode (same interface as HighScoreStore)"""
+    def __init__(self, path=DATABASE_PATH):
+        """initialization"""
+        self.path = path
+        self.connection = sqlite3.connect(path, timeout=BUSY_TIMEOUT_MS / 1000)
+        # WAL lets readers keep going while another process writes
+        self.connection.execute('PRAGMA journal_mode=WAL')
+        self.connection.execute('PRAGMA synchronous=NORMAL')
+        self.connection.execute(f'PRAGMA busy_timeout={BUSY_TIMEOUT_MS}')
+        with self.connection:
+            self.connection.executescript(SCHEMA)
+
+    def add(self, highscore, level_times=None):
+        """Save one run. level_times are the ms each completed level took, in order"""
+        self.add_many([(highscore, level_times)])
+
+    def add_many(self, runs):
+        """Save a batch of (HighScore, level_times) in a single transaction"""
+        now = time.time()
+        with self.connection:
+            for highscore, times in runs:
+                cursor = self.connection.execute(
+                    'INSERT INTO runs (initials, score, saved_at) VALUES (?, ?, ?)',
+                    (str(highscore.initials), int(highscore.score), now))
+                if times:
+                    self.connection.executemany(
+                        'INSERT INTO level_times (run_id, level, time_ms) VALUES (?, ?, ?)',
+                        [(cursor.lastrowid, level, time_ms) for level, time_ms in enumerate(times, start=1)])
+
+    def top(self, n=5):
+        """Best n whole-game scores, read straight off the score index"""
+        rows = self.connection.execute(
+            'SELECT initials, score FROM runs ORDER BY score DESC, id LIMIT ?', (n,))
+        return [HighScore(initials, score) for initials, score in rows]
+
+    def best_level_times(self, level, n=10):
+        """Fastest n (initials, time_ms) for a level (1-based), e.g. the top 10 for Level_02"""
+        rows = self.connection.execute(
+            'SELECT runs.initials, level_times.time_ms FROM level_times '
+            'JOIN runs ON runs.id = level_times.run_id '
+            'WHERE level_times.level = ? ORDER BY level_times.time_ms, level_times.run_id LIMIT ?',
+            (level, n))
+        return list(rows)
+
+    def record_count(self):
+        """How many runs have been saved"""
+        return self.connection.execute('SELECT COUNT(*) FROM runs').fetchone()[0]
+
+    def history(self):
+        """Every score ever saved, oldest first"""
+        for initials, score in self.connection.execute('SELECT initials, score FROM runs ORDER BY id'):
+            yield HighScore(initials, score)
+
+    def import_text(self, path=LEGACY_PATH):
+        """Bring in scores from the old 'INITIALS SCORE' text file"""
+        runs = [(HighScore(initials, score), None) for initials, score in parse_legacy_scores(path)]
+        if runs:
+            self.add_many(runs)
+
+    def close(self):
+        """Close the database connection"""
+        self.connection.close()
+
+if __name__ == "__main__":
+    store = SQLiteScoreStore()
+    print("Top scores:")
+    for i, highscore in enumerate(store.top(10)):
+        print(f"  {i + 1}. {highscore}")
+    for level in (1, 2, 3):
+        print(f"Best {level_name(level)} times:")
+        for initials, time_ms in store.best_level_times(level):
+            print(f"  {initials} {time_ms / 1000:.2f}s")
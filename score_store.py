@@ -0,0 +1,169 @@
+"""Keeps every high score ever saved in an append-only binary file, plus a small top-K index"""
+__version__ = '04/02/2025'
+__author__ = 'Kayla Cao'
+
+import bisect
+import os
+import struct
+import time
+from HighScore import HighScore
+
+HISTORY_PATH = 'scores.dat'
+INDEX_PATH = 'scores.idx'
+LEGACY_PATH = 'scores.txt'  # the old text format, imported the first time
+TOP_K = 10
+INITIALS_SIZE = 16
+
+RECORD = struct.Struct('<16sqd')  # initials (utf-8, zero padded), score, unix time saved
+INDEX_MAGIC = b'VFPI'
+INDEX_HEADER = struct.Struct('<4sII')  # magic, history records covered, entries that follow
+INDEX_ENTRY = struct.Struct('<16sqI')  # initials, score, record number in the history
+
+def pack_initials(initials):
+    """Initials as the fixed-width field used in both files"""
+    return str(initials).encode('utf-8')[:INITIALS_SIZE].ljust(INITIALS_SIZE, b'\0')
+
+def unpack_initials(raw):
+    """Back from the fixed-width field"""
+    return raw.rstrip(b'\0').decode('utf-8', errors='replace')
+
+def write_atomically(path, data):
+    """Replace a file with data (bytes) so that after a crash or power cut it holds either the old
+    contents or the new ones: write a temp file, fsync it, rename it over, then fsync the directory
+    so the rename itself is on disk"""
+    temp_path = path + '.tmp'
+    with open(temp_path, 'wb') as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_path, path)
+    if hasattr(os, 'O_DIRECTORY'):  # Windows can't open or fsync a directory
+        directory = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(directory)
+        finally:
+            os.close(directory)
+
+def parse_legacy_scores(path=LEGACY_PATH):
+    """(initials, score) for each line of the old 'INITIALS SCORE' text file. Stops at the first
+    unreadable line, keeping what came before it"""
+    try:
+        with open(path, 'r') as f:
+            for line in f:
+                temp = line.split()
+                if len(temp) >= 2:  # Make sure we have both initials and score
+                    yield temp[0], int(temp[1])
+    except (OSError, ValueError) as e:
+        print(f"Error importing scores: {e}")
+
+class HighScoreStore:
+    """Append-only score history with a top-K index so reading the leaderboard is cheap"""
+    def __init__(self, history_path=HISTORY_PATH, index_path=INDEX_PATH, k=TOP_K):
+        """initialization"""
+        self.history_path = history_path
+        self.index_path = index_path
+        self.k = k
+        self.top_entries = []  # sorted (-score, record number, initials), best first
+        self.covered = 0  # history records the index accounts for
+        self.load_index()
+
+    def record_count(self):
+        """Whole records in the history file (a torn write at the end is ignored)"""
+        try:
+            return os.path.getsize(self.history_path) // RECORD.size
+        except OSError:
+            return 0
+
+    def load_index(self):
+        """Read the top-K index, then fold in any records saved after it was last written"""
+        self.top_entries = []
+        self.covered = 0
+        try:
+            with open(self.index_path, 'rb') as f:
+                data = f.read()
+            magic, covered, count = INDEX_HEADER.unpack_from(data)
+            if magic != INDEX_MAGIC:
+                raise ValueError("bad index")
+            for i in range(count):
+                raw, score, number = INDEX_ENTRY.unpack_from(data, INDEX_HEADER.size + i * INDEX_ENTRY.size)
+                self.top_entries.append((-score, number, unpack_initials(raw)))
+            self.covered = covered
+        except (OSError, ValueError, struct.error):
+            # Missing or damaged index: rebuild it from the full history
+            self.top_entries = []
+            self.covered = 0
+
+        total = self.record_count()
+        if self.covered > total:
+            # index is from a different history file; start over
+            self.top_entries = []
+            self.covered = 0
+        if self.covered < total:
+            self.catch_up(total)
+
+    def catch_up(self, total):
+        """Insert history records the index hasn't seen yet (after a crash or a rebuild)"""
+        with open(self.history_path, 'rb') as f:
+            f.seek(self.covered * RECORD.size)
+            for number in range(self.covered, total):
+                raw, score, saved_at = RECORD.unpack(f.read(RECORD.size))
+                self.insert(-score, number, unpack_initials(raw))
+        self.covered = total
+        self.write_index()
+
+    def insert(self, neg_score, number, initials):
+        """Binary search the record into the top-K list, O(log K) to find its place"""
+        entry = (neg_score, number, initials)
+        if len(self.top_entries) >= self.k and entry >= self.top_entries[-1]:
+            return
+        bisect.insort(self.top_entries, entry)
+        del self.top_entries[self.k:]
+
+    def write_index(self):
+        """Save the top-K index (it can always be rebuilt from the history if it's lost)"""
+        data = bytearray(INDEX_HEADER.pack(INDEX_MAGIC, self.covered, len(self.top_entries)))
+        for neg_score, number, initials in self.top_entries:
+            data += INDEX_ENTRY.pack(pack_initials(initials), -neg_score, number)
+        write_atomically(self.index_path, bytes(data))
+
+    def append_records(self, highscores):
+        """Durably append scores to the history. Returns the record number of the first one"""
+        number = self.record_count()
+        now = time.time()
+        with open(self.history_path, 'ab') as f:
+            # drop a torn record left by a crash so every record stays aligned
+            if f.tell() != number * RECORD.size:
+                f.truncate(number * RECORD.size)
+            f.write(b''.join(RECORD.pack(pack_initials(highscore.initials), int(highscore.score), now)
+                             for highscore in highscores))
+            f.flush()
+            os.fsync(f.fileno())
+        return number
+
+    def add(self, highscore, level_times=None):
+        """Append a score to the history and update the index (level times aren't kept in this format)"""
+        number = self.append_records([highscore])
+        self.insert(-int(highscore.score), number, str(highscore.initials))
+        self.covered = number + 1
+        self.write_index()
+
+    def top(self, n=5):
+        """Best n scores, best first, without reading the history"""
+        return [HighScore(initials, -neg_score) for neg_score, number, initials in self.top_entries[:n]]
+
+    def history(self):
+        """Every score ever saved, oldest first (reads the whole file)"""
+        total = self.record_count()
+        if not total:
+            return
+        with open(self.history_path, 'rb') as f:
+            for _ in range(total):
+                raw, score, saved_at = RECORD.unpack(f.read(RECORD.size))
+                yield HighScore(unpack_initials(raw), score)
+
+    def import_text(self, path=LEGACY_PATH):
+        """Bring in scores from the old 'INITIALS SCORE' text file"""
+        scores = [HighScore(initials, score) for initials, score in parse_legacy_scores(path)]
+        if scores:
+            self.append_records(scores)
+            self.catch_up(self.record_count())
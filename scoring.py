@@ -0,0 +1,104 @@
+"""Works out a run's score from what happens in it (gold collected, levels completed, lives lost)"""
+__version__ = '04/02/2025'
+__author__ = 'Kayla Cao'
+
+from collections import namedtuple
+
+# Time-based scoring tiers (in seconds)
+TIME_SCORING_TIERS = [
+    (15, 1000),   # If level completed in 15 seconds or less, 1000 points
+    (30, 800),    # If level completed in 30 seconds or less, 800 points
+    (45, 600),    # If level completed in 45 seconds or less, 600 points
+    (60, 300),    # If level completed in 60 seconds or less, 300 points
+    (float('inf'), 100)  # Any time beyond 60 seconds, 100 points
+]
+GOLD_POINTS = 250  # per gold piece
+FULL_LEVEL_GOLD_BONUS = 500  # finishing a level with all its gold
+FULL_GAME_GOLD_BONUS = 2000  # collecting every gold piece in the game
+LIFE_LOST_POINTS = 0  # losing a life costs nothing (yet), but it's still part of the event stream
+
+# What can happen in a run that affects the score. frame is the simulation step it happened on
+GoldCollected = namedtuple('GoldCollected', 'frame level')
+LevelCompleted = namedtuple('LevelCompleted', 'frame level time_ms')
+LifeLost = namedtuple('LifeLost', 'frame level')
+
+def time_points(time_ms):
+    """Points for finishing a level in time_ms"""
+    for max_time, points in TIME_SCORING_TIERS:
+        if time_ms / 1000.0 <= max_time:
+            return points
+    return 0
+
+class ScoreEngine:
+    """Keeps a run's score up to date as events happen, O(1) per event, and keeps the events
+    so the run can be scored again or analysed without replaying it"""
+    def __init__(self, level_gold_totals):
+        """initialization (level_gold_totals is how much gold each level starts with)"""
+        self.level_gold_totals = list(level_gold_totals)
+        self.total_gold = sum(self.level_gold_totals)
+        self.level_gold = [0] * len(self.level_gold_totals)
+        self.gold_count = 0
+        self.lives_lost = 0
+        self.levels_completed = 0  # levels are played in order, so this is also the level being played
+        self.score = 0
+        self.events = []
+        self.frame = 0  # stamped on new events; the simulation keeps it current
+
+    @classmethod
+    def for_levels(cls, levels):
+        """An engine for a set of freshly built levels, counting the gold each one holds"""
+        return cls([len(level.gold_list) for level in levels])
+
+    def apply(self, event):
+        """Score one event. Returns the points it was worth"""
+        points = 0
+        if isinstance(event, GoldCollected):
+            self.gold_count += 1
+            self.level_gold[event.level] += 1
+            points = GOLD_POINTS
+            if self.gold_count == self.total_gold:
+                points += FULL_GAME_GOLD_BONUS
+        elif isinstance(event, LevelCompleted):
+            self.levels_completed += 1
+            points = time_points(event.time_ms)
+            if self.level_gold[event.level] == self.level_gold_totals[event.level]:
+                points += FULL_LEVEL_GOLD_BONUS
+        elif isinstance(event, LifeLost):
+            self.lives_lost += 1
+            points = LIFE_LOST_POINTS
+        else:
+            raise TypeError(f"not a scoring event: {event!r}")
+        self.score += points
+        self.events.append(event)
+        return points
+
+    def gold_collected(self, level):
+        """The player picked up a gold piece in a level (0-based)"""
+        return self.apply(GoldCollected(self.frame, level))
+
+    def level_completed(self, level, time_ms):
+        """The player finished a level (0-based) after time_ms in it"""
+        return self.apply(LevelCompleted(self.frame, level, time_ms))
+
+    def life_lost(self):
+        """The player lost a life in the level being played"""
+        return self.apply(LifeLost(self.frame, self.levels_completed))
+
+def score_events(events, level_gold_totals):
+    """Score a recorded event stream from scratch"""
+    engine = ScoreEngine(level_gold_totals)
+    for event in events:
+        engine.apply(event)
+    return engine.score
+
+def level_times(level_start_times, level_end_times):
+    """How long each completed level took, in ms"""
+    return [end - start for start, end in zip(level_start_times, level_end_times)]
+
+def run_claims(sim):
+    """What a finished run says it achieved, as saved next to its replay"""
+    return {
+        'score': sim.scoring.score,
+        'level_times': level_times(sim.level_start_times, sim.level_end_times),
+        'level_gold': list(sim.player.level_gold_count),
+    }
@@ -0,0 +1,172 @@
+"""The game rules, one fixed step at a time. Works with a window or completely headless."""
+__version__ = '04/02/2025'
+__author__ = 'Kayla Cao'
+
+import time
+import pygame
+from config import *
+from player import *
+from levels import *
+from profiler import INPUT, PLAYER, LEVEL, SCROLL, CHECKS
+from scoring import ScoreEngine
+
+class Simulation:
+    """Owns the player and the levels and advances them one fixed step at a time"""
+    def __init__(self, headless=False):
+        """initialization"""
+        self.headless = headless  # no window, no audio, no fonts
+
+        self.player = Player(headless)
+        self.level_list = [Level_01(self.player), Level_02(self.player), Level_03(self.player)]
+
+        self.current_level_no = 0  # change number to debug certain level
+        self.current_level = self.level_list[self.current_level_no]
+        self.player.level = self.current_level
+        self.place_player()
+
+        self.active_sprite_list = pygame.sprite.Group()
+        self.active_sprite_list.add(self.player)
+
+        # Simulation clock, in steps; level times come from this so they're the same on any machine
+        self.frame = 0
+
+        # Track level start times and gold
+        self.level_start_times = [0]
+        self.level_gold_count = [0] * len(self.level_list)  # Initialize with zeros for each level
+        self.level_end_times = []
+
+        # Running score, fed events by the player and the level checks below
+        self.scoring = ScoreEngine.for_levels(self.level_list)
+        self.player.scoring = self.scoring
+
+        self.game_over = False
+
+        # Optional FrameProfiler; the windowed game sets one to time each phase of a step
+        self.profiler = None
+
+    @property
+    def time_ms(self):
+        """Simulated time since the run started"""
+        return self.frame * STEP_MS
+
+    def place_player(self):
+        """Put the player on the first platform of the current level"""
+        if self.current_level.platform_list:
+            first_platform = list(self.current_level.platform_list)[0]
+            self.player.rect.bottom = first_platform.rect.top
+            self.player.rect.x = first_platform.rect.x
+        else:
+            self.player.rect.x = 340
+            self.player.rect.y = SCREEN_HEIGHT - self.player.rect.height
+
+    def step(self, left, right, jump=False):
+        """Advance the game by one fixed step with the given movement keys held.
+        jump is True if the jump key was pressed since the last step"""
+        player = self.player
+        profiler = self.profiler
+        self.current_level.save_positions()
+        self.scoring.frame = self.frame
+
+        # Jump presses are applied at the start of a step so replays line up exactly
+        if jump and not player.is_respawning:
+            player.jump()
+
+        # Player movement
+        if player.wall_jump_timer <= 0 and not player.is_respawning:
+            if left:
+                player.go_left()
+            elif right:
+                player.go_right()
+            else:
+                player.stop()
+        if profiler:
+            profiler.lap(INPUT)
+
+        # Update game state
+        self.active_sprite_list.update(self.current_level_no)
+        if profiler:
+            profiler.lap(PLAYER)
+        self.current_level.update()
+        self.frame += 1
+        if profiler:
+            profiler.lap(LEVEL)
+
+        # Scroll the camera to keep the player between the boundaries
+        self.current_level.camera.follow(player.rect)
+        if profiler:
+            profiler.lap(SCROLL)
+
+        # Level progression (player's screen x plus the world shift, as before the camera)
+        current_position = self.current_level.camera.apply(player.rect).x + self.current_level.world_shift
+        if current_position < self.current_level.level_limit:
+            if self.current_level_no < len(self.level_list) - 1:
+                player.sound_manager.play_level_completed()
+                # Record end time for current level
+                self.level_end_times.append(self.time_ms)
+                self.scoring.level_completed(self.current_level_no,
+                                             self.time_ms - self.level_start_times[self.current_level_no])
+
+                # Move to next level
+                self.current_level_no += 1
+                self.current_level = self.level_list[self.current_level_no]
+                player.level = self.current_level
+                self.current_level.invalidate_view()
+
+                # Reset world shift
+                self.current_level.camera.reset()
+
+                # Reset player position
+                if self.current_level.platform_list:
+                    self.place_player()
+
+                # Trigger respawning effect for level transition
+                player.is_respawning = True
+                player.respawn_timer = 0
+
+                # Track new level start time
+                self.level_start_times.append(self.time_ms)
+
+            else:
+                # Player has completed all levels
+                self.level_end_times.append(self.time_ms)
+                self.scoring.level_completed(self.current_level_no,
+                                             self.time_ms - self.level_start_times[self.current_level_no])
+                self.current_level_no += 1
+                self.game_over = True
+                if profiler:
+                    profiler.lap(CHECKS)
+                return
+
+        # Track gold collection per level
+        gold_hit = self.current_level.collide_any(player, self.current_level.gold_list)
+        if gold_hit:
+            # Check if this specific gold piece hasn't been collected before
+            if gold_hit in self.current_level.gold_list:
+                # Increment the gold count for the current level
+                self.level_gold_count[self.current_level_no] += 1
+                # Remove the gold piece from the level's gold list
+                self.current_level.gold_list.remove(gold_hit)
+
+            # Collect the gold (this will play sound and remove the gold from all sprite groups)
+            player.collect_gold(gold_hit, self.current_level_no)
+
+        # Game over check
+        if player.lives <= 0:
+            self.game_over = True
+        if profiler:
+            profiler.lap(CHECKS)
+
+def benchmark(frames=100000):
+    """Steps a headless game as fast as possible and reports steps per second"""
+    sim = Simulation(headless=True)
+    start = time.perf_counter()
+    for frame in range(frames):
+        if sim.game_over:
+            sim = Simulation(headless=True)
+        sim.step(False, True, frame % 30 == 0)  # hold right, jump now and then
+    elapsed = time.perf_counter() - start
+    print(f"{frames} steps in {elapsed:.2f}s: {frames / elapsed:.0f} steps/s "
+          f"({frames / elapsed / SIMULATION_HZ:.0f}x real time)")
+
+if __name__ == "__main__":
+    benchmark()
@@ -2,68 +2,237 @@
 _version__ = '04/02/2025'
 __author__ = 'Kayla Cao'
 
+import threading
+import time
 import pygame
 
+# Sound effects, decoded the first time they're played and shared by every SoundManager
+SOUND_FILES = {
+    'bouncepad': 'sounds/bouncepad.wav',
+    'game_lost': 'sounds/game_lost.wav',
+    'game_won': 'sounds/game_won.wav',
+    'gold_collect': 'sounds/gold_collect.wav',
+    'level_completed': 'sounds/level_completed.wav',
+    'lose_life': 'sounds/lose_life.wav',
+}
+
+# Background music is streamed from disk through pygame.mixer.music instead of decoded whole
+MUSIC_FILES = {
+    'bg_music': ('sounds/bg_music.wav', 1.0),
+    'bg_music_funny': ('sounds/bg_music_funny.wav', 0.3),  # for funny background music
+}
+
+# Voice pool: how many effects can play at once, and which ones win when they can't
+VOICE_CHANNELS = 8
+MERGE_WINDOW_MS = 80  # repeat triggers of the same effect closer than this play once
+SOUND_PRIORITIES = {
+    'game_won': 3,
+    'game_lost': 3,
+    'level_completed': 2,
+    'lose_life': 2,
+    'gold_collect': 1,
+    'bouncepad': 0,
+}
+
+class VoicePool:
+    """Hands out mixer channels: merges rapid repeats and steals the least important voice when full"""
+    def __init__(self, channels=VOICE_CHANNELS, merge_window_ms=MERGE_WINDOW_MS):
+        """initialization"""
+        self.channel_count = channels
+        self.merge_window = merge_window_ms / 1000
+        self.channels = None  # made once the mixer is running
+        self.voices = {}  # channel index -> (name, priority, start time)
+        self.last_trigger = {}  # name -> time it last started playing
+        self.stats = {'played': 0, 'merged': 0, 'dropped': 0, 'stolen': 0}
+
+    def setup(self):
+        """Grab the mixer channels the pool manages"""
+        pygame.mixer.set_num_channels(self.channel_count)
+        self.channels = [pygame.mixer.Channel(i) for i in range(self.channel_count)]
+
+    def play(self, name, sound):
+        """Play an effect on a free (or stolen) channel. Returns False if it was merged or dropped"""
+        if self.channels is None:
+            self.setup()
+        now = time.monotonic()
+
+        # Same effect fired again right away (e.g. bouncepad every frame): let the first one play
+        last = self.last_trigger.get(name)
+        if last is not None and now - last < self.merge_window:
+            self.stats['merged'] += 1
+            return False
+
+        priority = SOUND_PRIORITIES.get(name, 0)
+        index = self.free_channel()
+        if index is None:
+            # All busy: steal the lowest priority voice (oldest first), unless everything outranks us
+            index = min(self.voices, key=lambda i: (self.voices[i][1], self.voices[i][2]))
+            if self.voices[index][1] > priority:
+                self.stats['dropped'] += 1
+                return False
+            self.channels[index].stop()
+            self.stats['stolen'] += 1
+
+        self.channels[index].play(sound)
+        self.voices[index] = (name, priority, now)
+        self.last_trigger[name] = now
+        self.stats['played'] += 1
+        return True
+
+    def free_channel(self):
+        """Index of a channel that isn't playing anything, or None"""
+        for index, channel in enumerate(self.channels):
+            if not channel.get_busy():
+                self.voices.pop(index, None)
+                return index
+        return None
+
+class SoundBank:
+    """Process-wide cache of decoded sound effects"""
+    def __init__(self):
+        """initialization"""
+        self.sounds = {}  # name -> pygame.mixer.Sound, or None if it failed to load
+        self.lock = threading.Lock()
+        self.current_music = None  # name of the track pygame.mixer.music is playing
+        self.voices = VoicePool()
+
+    def get(self, name):
+        """Returns the decoded sound, loading it on first use"""
+        if name in self.sounds:
+            return self.sounds[name]
+        with self.lock:
+            if name not in self.sounds:
+                try:
+                    self.sounds[name] = pygame.mixer.Sound(SOUND_FILES[name])
+                except Exception as e:
+                    print(f"Error loading sounds: {e}")
+                    self.sounds[name] = None
+        return self.sounds[name]
+
+    def preload(self, background=True):
+        """Decode every effect now (on a background thread by default) so the first play isn't late"""
+        def load_all():
+            for name in SOUND_FILES:
+                self.get(name)
+
+        if not background:
+            load_all()
+            return None
+        thread = threading.Thread(target=load_all, name='sound-preload', daemon=True)
+        thread.start()
+        return thread
+
+SOUND_BANK = SoundBank()
+
 class SoundManager:
     """Manages your sounds"""
     def __init__(self):
-        """initialization"""
-        # Initialize pygame mixer
-        pygame.mixer.init()
+        """initialization (cheap: the mixer is set up once and sounds are shared)"""
+        if not pygame.mixer.get_init():
+            pygame.mixer.init()
+        self.bank = SOUND_BANK
 
-        # Load sounds (make sure to have these sound files in a 'sounds' folder)
-        try:
-            self.bouncepad_sound = pygame.mixer.Sound("sounds/bouncepad.wav")
-            self.game_lost_sound = pygame.mixer.Sound("sounds/game_lost.wav")
-            self.game_won_sound = pygame.mixer.Sound("sounds/game_won.wav")
-            self.gold_collect_sound = pygame.mixer.Sound("sounds/gold_collect.wav")
-            self.level_completed_sound = pygame.mixer.Sound("sounds/level_completed.wav")
-            self.lose_life_sound = pygame.mixer.Sound("sounds/lose_life.wav")
-
-            # Background music
-            self.bg_music = pygame.mixer.Sound('sounds/bg_music.wav')
-            self.bg_music_funny = pygame.mixer.Sound('sounds/bg_music_funny.wav') #for funny background music
-            self.bg_music_funny.set_volume(0.3)
+    def preload(self, background=True):
+        """Decode every effect ahead of time"""
+        return self.bank.preload(background)
 
-        except Exception as e:
-            print(f"Error loading sounds: {e}")
+    def play(self, name):
+        """plays a sound effect by name through the shared voice pool"""
+        sound = self.bank.get(name)
+        if sound is not None:
+            self.bank.voices.play(name, sound)
+
+    def voice_stats(self):
+        """How many plays went through, were merged, dropped or stole a channel"""
+        return dict(self.bank.voices.stats)
 
     def play_bouncepad(self):
         """play boing sound"""
-        self.bouncepad_sound.play()
+        self.play('bouncepad')
 
     def play_game_lost(self):
         """plays game over sound"""
-        self.game_lost_sound.play()
+        self.play('game_lost')
 
     def play_game_won(self):
         """plays woo! sound"""
-        self.game_won_sound.play()
+        self.play('game_won')
 
     def play_gold_collect(self):
         """plays collection sound"""
-        self.gold_collect_sound.play()
+        self.play('gold_collect')
 
     def play_level_completed(self):
         """plays level completed sound"""
-        self.level_completed_sound.play()
+        self.play('level_completed')
 
     def play_lose_life(self):
         """plays oof sound"""
-        self.lose_life_sound.play()
+        self.play('lose_life')
+
+    def play_music(self, name):
+        """streams a background track forever"""
+        path, volume = MUSIC_FILES[name]
+        try:
+            pygame.mixer.music.load(path)
+        except Exception as e:
+            print(f"Error loading sounds: {e}")
+            self.bank.current_music = None
+            return
+        pygame.mixer.music.set_volume(volume)
+        pygame.mixer.music.play(loops=-1)  # play forever
+        self.bank.current_music = name
+
+    def stop_music(self, name):
+        """stops a background track if it's the one playing"""
+        if self.bank.current_music == name:
+            pygame.mixer.music.stop()
+            self.bank.current_music = None
 
     def play_bg_music(self):
         """plays video game background music"""
-        self.bg_music.play(loops=-1) #play forever
+        self.play_music('bg_music')
 
     def stop_bg_music(self):
         """stops video game background music"""
-        self.bg_music.stop()
+        self.stop_music('bg_music')
 
     def play_bg_music_funny(self):
         """plays funny background music"""
-        self.bg_music_funny.play(loops=-1) #play forever
+        self.play_music('bg_music_funny')
 
     def stop_bg_music_funny(self):
         """stops funny background music"""
-        self.bg_music_funny.stop()
\ No newline at end of file
+        self.stop_music('bg_music_funny')
+
+class SilentSoundManager:
+    """Stands in for SoundManager when there's no audio device (headless runs)"""
+    def play_bouncepad(self):
+        """does nothing"""
+
+    def play_game_lost(self):
+        """does nothing"""
+
+    def play_game_won(self):
+        """does nothing"""
+
+    def play_gold_collect(self):
+        """does nothing"""
+
+    def play_level_completed(self):
+        """does nothing"""
+
+    def play_lose_life(self):
+        """does nothing"""
+
+    def play_bg_music(self):
+        """does nothing"""
+
+    def stop_bg_music(self):
+        """does nothing"""
+
+    def play_bg_music_funny(self):
+        """does nothing"""
+
+    def stop_bg_music_funny(self):
+        """does nothing"""
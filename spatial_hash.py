@@ -0,0 +1,107 @@
+"""Uniform grid that lets collision checks only look at pieces near the player"""
+__version__ = '04/02/2025'
+__author__ = 'Kayla Cao'
+
+import pygame
+
+CELL_SIZE = 128  # pixels per grid cell
+
+class SpatialHash:
+    """Buckets sprites by the grid cells their rect touches"""
+    def __init__(self, cell_size=CELL_SIZE):
+        """initialization"""
+        self.cell_size = cell_size
+        self.cells = {}  # (col, row) -> {sprite: None}
+        self.sprite_cells = {}  # sprite -> (col1, row1, col2, row2)
+        self.order = {}  # sprite -> insertion number, keeps query results stable
+        self.count = 0
+
+    def cell_range(self, rect):
+        """Returns the range of cells a rect covers"""
+        size = self.cell_size
+        return (rect.left // size, rect.top // size,
+                (rect.right - 1) // size, (rect.bottom - 1) // size)
+
+    def insert(self, sprite):
+        """Add a sprite to every cell its rect touches"""
+        if sprite in self.sprite_cells:
+            return
+        self.order[sprite] = self.count
+        self.count += 1
+        cells = self.cell_range(sprite.rect)
+        self.sprite_cells[sprite] = cells
+        self.add_to_cells(sprite, cells)
+
+    def remove(self, sprite):
+        """Take a sprite out of the grid"""
+        cells = self.sprite_cells.pop(sprite, None)
+        if cells is None:
+            return
+        self.order.pop(sprite, None)
+        self.remove_from_cells(sprite, cells)
+
+    def move(self, sprite):
+        """Re-bucket a sprite, but only if it crossed into different cells"""
+        old_cells = self.sprite_cells.get(sprite)
+        if old_cells is None:
+            return
+        new_cells = self.cell_range(sprite.rect)
+        if new_cells != old_cells:
+            self.remove_from_cells(sprite, old_cells)
+            self.add_to_cells(sprite, new_cells)
+            self.sprite_cells[sprite] = new_cells
+
+    def add_to_cells(self, sprite, cells):
+        """helper for insert/move"""
+        col1, row1, col2, row2 = cells
+        for col in range(col1, col2 + 1):
+            for row in range(row1, row2 + 1):
+                self.cells.setdefault((col, row), {})[sprite] = None
+
+    def remove_from_cells(self, sprite, cells):
+        """helper for remove/move"""
+        col1, row1, col2, row2 = cells
+        for col in range(col1, col2 + 1):
+            for row in range(row1, row2 + 1):
+                bucket = self.cells.get((col, row))
+                if bucket is not None:
+                    bucket.pop(sprite, None)
+                    if not bucket:
+                        del self.cells[(col, row)]
+
+    def query(self, rect):
+        """Returns every sprite sharing a cell with the rect (may include near misses)"""
+        col1, row1, col2, row2 = self.cell_range(rect)
+        found = {}
+        for col in range(col1, col2 + 1):
+            for row in range(row1, row2 + 1):
+                bucket = self.cells.get((col, row))
+                if bucket:
+                    found.update(bucket)
+        return sorted(found, key=self.order.__getitem__)
+
+class IndexedGroup(pygame.sprite.Group):
+    """A sprite group that keeps its level's spatial hash in sync"""
+    def __init__(self, level, *sprites):
+        """initialization"""
+        self.level = level
+        super().__init__(*sprites)
+
+    def add_internal(self, sprite, layer=None):
+        """Index the sprite as it joins the group"""
+        super().add_internal(sprite, layer)
+        self.level.grid.insert(sprite)
+        if getattr(sprite, 'moves', False):
+            self.level.movers[sprite] = None
+        if getattr(sprite, 'moves', False) or self is self.level.laser_list:
+            self.level.movers_changed()
+        self.level.piece_added(sprite)
+
+    def remove_internal(self, sprite):
+        """Drop the sprite from the index when it leaves (e.g. gold.kill())"""
+        super().remove_internal(sprite)
+        self.level.grid.remove(sprite)
+        self.level.movers.pop(sprite, None)
+        if getattr(sprite, 'moves', False) or self is self.level.laser_list:
+            self.level.movers_changed()
+        self.level.piece_removed(sprite)
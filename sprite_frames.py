@@ -0,0 +1,55 @@
+"""Pre-scaled player poses so switching animation frames is just a reference swap"""
+__version__ = '04/02/2025'
+__author__ = 'Kayla Cao'
+
+import pygame
+
+# where each pose lives on the sprite sheet (x, y, width, height)
+POSE_RECTS = {
+    'idle': (0, 0, 75, 150),
+    'run_right': (0, 160, 110, 120),
+    'jump': (170, 0, 60, 140),
+}
+
+FLASH_ALPHA = 128  # how see-through the player is while respawning
+
+class SpriteFrames:
+    """Builds every pose once at the target size, plus a faded copy for the respawn flash"""
+    def __init__(self, sheet, width, height):
+        """initialization. Pass sheet=None for a headless player that is never drawn"""
+        self.width = width
+        self.height = height
+        self.frames = {}  # pose -> (normal, faded)
+
+        if sheet is None:
+            blank = pygame.Surface((width, height))
+            for pose in ('idle', 'run_right', 'run_left', 'jump'):
+                self.frames[pose] = (blank, blank)
+            return
+
+        idle = self.scale(sheet.subsurface(POSE_RECTS['idle']))
+        run_right = self.scale(sheet.subsurface(POSE_RECTS['run_right']))
+        run_left = pygame.transform.flip(run_right, True, False)
+        jump = self.scale(sheet.subsurface(POSE_RECTS['jump']))
+
+        for pose, image in (('idle', idle), ('run_right', run_right),
+                            ('run_left', run_left), ('jump', jump)):
+            self.frames[pose] = (image, self.fade(image))
+
+    def scale(self, sprite):
+        """Scale a raw sheet sprite to the player size in display format"""
+        image = pygame.transform.scale(sprite, (self.width, self.height))
+        if pygame.display.get_surface() is not None:
+            image = image.convert_alpha()
+        return image
+
+    def fade(self, image):
+        """Bake the respawn flash alpha into a copy of the image"""
+        faded = image.copy()
+        faded.fill((255, 255, 255, FLASH_ALPHA), special_flags=pygame.BLEND_RGBA_MULT)
+        return faded
+
+    def get(self, pose, faded=False):
+        """Returns the cached image for a pose"""
+        normal, flash = self.frames[pose]
+        return flash if faded else normal
@@ -0,0 +1,55 @@
+"""One shared Surface per distinct piece look, so identical pieces don't each build their own"""
+__version__ = '04/02/2025'
+__author__ = 'Kayla Cao'
+
+import pygame
+
+surfaces = {}  # (size, color, shape, orientation, display format?) -> Surface
+
+def spike_points(width, height, orientation):
+    """The triangle a spike is drawn as, in its own coordinates"""
+    if orientation == 'down':
+        return [
+            (0, 0),  # Top left
+            (width // 2, height),  # Bottom middle
+            (width, 0)  # Top right
+        ]
+    elif orientation == 'left':
+        return [
+            (width, height),  # Bottom right
+            (0, height // 2),  # Middle left
+            (width, 0)  # Top right
+        ]
+    elif orientation == 'right':
+        return [
+            (0, 0),  # Top left
+            (width, height // 2),  # Middle right
+            (0, height)  # Bottom left
+        ]
+    # Up, and the default for anything else
+    return [
+        (0, height),  # Bottom left
+        (width // 2, 0),  # Top middle
+        (width, height)  # Bottom right
+    ]
+
+def build_surface(size, color, shape, orientation, convert):
+    """Make a piece image: a filled rect, or a triangle on a transparent background"""
+    if shape == 'triangle':
+        surface = pygame.Surface(size, pygame.SRCALPHA)
+        pygame.draw.polygon(surface, color, spike_points(size[0], size[1], orientation))
+        return surface.convert_alpha() if convert else surface
+    surface = pygame.Surface(size)
+    surface.fill(color)
+    return surface.convert() if convert else surface
+
+def get_surface(size, color, shape='rect', orientation=None):
+    """The shared image for a piece look. Converted to the display format if there is a display.
+    Pieces share these, so never draw on one"""
+    # images made before the window opened can't be in its format, so they're kept apart
+    convert = pygame.display.get_surface() is not None
+    key = (tuple(size), tuple(color), shape, orientation, convert)
+    surface = surfaces.get(key)
+    if surface is None:
+        surface = surfaces[key] = build_surface(key[0], key[1], shape, orientation, convert)
+    return surface
@@ -0,0 +1,80 @@
+"""Re-runs a folder of recorded runs on every core and checks the results they claim"""
+__version__ = '04/02/2025'
+__author__ = 'Kayla Cao'
+
+import argparse
+import math
+import multiprocessing
+import os
+import time
+from config import *
+from replay import load_replay, run_replay
+from scoring import *
+
+REPLAY_EXTENSION = '.vfpr'
+
+def verify_replay(path):
+    """Replays one run headlessly and compares it with what it claims. Returns a result dict"""
+    result = {'path': path, 'ok': False, 'problems': [], 'steps': 0}
+    try:
+        masks, claims = load_replay(path)
+    except (OSError, ValueError) as e:
+        result['problems'].append(f"unreadable: {e}")
+        return result
+
+    sim = run_replay(masks)
+    result['steps'] = len(masks)
+    score = sim.scoring.score
+    times = level_times(sim.level_start_times, sim.level_end_times)
+    gold = list(sim.player.level_gold_count)
+    result['score'] = score
+
+    problems = result['problems']
+    if not sim.game_over:
+        problems.append("run never finished")
+    if claims.get('score') != score:
+        problems.append(f"claimed score {claims.get('score')}, replay scored {score}")
+    claimed_times = claims.get('level_times', [])
+    if len(claimed_times) != len(times) or \
+            not all(math.isclose(a, b, abs_tol=1e-6) for a, b in zip(claimed_times, times)):
+        problems.append(f"claimed level times {claimed_times}, replay took {times}")
+    if claims.get('level_gold') != gold:
+        problems.append(f"claimed gold {claims.get('level_gold')}, replay collected {gold}")
+
+    result['ok'] = not problems
+    return result
+
+def find_replays(directory):
+    """Every replay file in a folder, in a stable order"""
+    return sorted(os.path.join(directory, name) for name in os.listdir(directory)
+                  if name.endswith(REPLAY_EXTENSION))
+
+def verify_directory(directory, processes=None):
+    """Spreads the replays in a folder over a process pool, printing results as they arrive"""
+    paths = find_replays(directory)
+    processes = processes or os.cpu_count() or 1
+    passed = 0
+    start = time.perf_counter()
+
+    with multiprocessing.Pool(processes) as pool:
+        # small chunks keep results streaming in while still cutting down on IPC
+        chunksize = max(1, len(paths) // (processes * 8))
+        for result in pool.imap_unordered(verify_replay, paths, chunksize):
+            if result['ok']:
+                passed += 1
+                print(f"PASS {result['path']} (score {result['score']})")
+            else:
+                print(f"FAIL {result['path']}: {'; '.join(result['problems'])}")
+
+    elapsed = time.perf_counter() - start
+    rate = len(paths) / elapsed if elapsed > 0 else 0
+    print(f"{passed}/{len(paths)} runs verified in {elapsed:.2f}s: "
+          f"{rate:.1f} runs/s, {rate / processes:.1f} runs/s per core ({processes} cores)")
+    return passed == len(paths)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('directory', nargs='?', default=REPLAY_DIR, help="folder of recorded runs")
+    parser.add_argument('-j', '--processes', type=int, default=None, help="worker processes (default: all cores)")
+    args = parser.parse_args()
+    raise SystemExit(0 if verify_directory(args.directory, args.processes) else 1)